@@ -0,0 +1,118 @@
+# Static sample data for the pages that don't use the database yet.
+# It lives here, at module level, so Python builds these lists and
+# dictionaries once at import instead of on every request.
+
+
+# All recipes page - This is a LIST of dictionaries - each dictionary is one recipe
+SAMPLE_RECIPES = [
+    {
+        'id': 1,  # This is a NUMBER (integer) - unique ID for each recipe
+        'name': 'Jollof Rice',  # This is a STRING (text)
+        'description': 'The most delicious West African rice dish with rich tomato flavor',
+        'prep_time': 45,  # NUMBER - how many minutes to make it
+        'difficulty': 'Medium',  # STRING - Easy, Medium, or Hard
+        'category': 'Main Dish',
+        'image': 'https://images.unsplash.com/photo-1604329760661-e71dc83f8f26?w=800'
+    },
+    {
+        'id': 2,
+        'name': 'Pancakes',
+        'description': 'Fluffy breakfast pancakes that melt in your mouth',
+        'prep_time': 20,
+        'difficulty': 'Easy',
+        'category': 'Breakfast',
+        'image': 'https://images.unsplash.com/photo-1567620905732-2d1ec7ab7445?w=800'
+    },
+    {
+        'id': 3,
+        'name': 'Chocolate Cake',
+        'description': 'Rich and moist chocolate cake perfect for celebrations',
+        'prep_time': 60,
+        'difficulty': 'Hard',
+        'category': 'Dessert',
+        'image': 'https://images.unsplash.com/photo-1578985545062-69928b1d9587?w=800'
+    },
+    {
+        'id': 4,
+        'name': 'Caesar Salad',
+        'description': 'Fresh and crispy salad with creamy caesar dressing',
+        'prep_time': 15,
+        'difficulty': 'Easy',
+        'category': 'Salad',
+        'image': 'https://images.unsplash.com/photo-1546793665-c74683f339c1?w=800'
+    },
+    {
+        'id': 5,
+        'name': 'Spaghetti Bolognese',
+        'description': 'Classic Italian pasta with hearty meat sauce',
+        'prep_time': 40,
+        'difficulty': 'Medium',
+        'category': 'Main Dish',
+        'image': 'https://images.unsplash.com/photo-1627308595229-7830a5c91f9f?w=800'
+    },
+    {
+        'id': 6,
+        'name': 'Chicken Curry',
+        'description': 'Spicy and flavorful curry with tender chicken pieces',
+        'prep_time': 50,
+        'difficulty': 'Medium',
+        'category': 'Main Dish',
+        'image': 'https://images.unsplash.com/photo-1588166524941-3bf61a9c41db?w=800'
+    }
+]
+
+
+# Single recipe page - a DICTIONARY of recipes, looked up by id (notice the curly braces {})
+SAMPLE_RECIPE_DETAILS = {
+    1: {
+        'id': 1,
+        'name': 'Jollof Rice',
+        'description': 'The most delicious West African rice dish with rich tomato flavor',
+        'prep_time': 45,
+        'servings': 6,  # This is a NUMBER - how many people it feeds
+        'difficulty': 'Medium',
+        'category': 'Main Dish',
+        'image': 'https://images.unsplash.com/photo-1604329760661-e71dc83f8f26?w=800',
+        # Ingredients are stored as one big string, separated by ||
+        'ingredients': '3 cups rice||4 tomatoes||2 onions||1 cup vegetable oil||2 cups chicken stock||1 tablespoon curry powder||1 teaspoon thyme||Salt and pepper to taste',
+        # Instructions also separated by ||
+        'instructions': 'Blend tomatoes and onions together||Heat oil in a large pot||Fry the blended mixture for 15 minutes||Add rice and stir well||Pour in the chicken stock||Add curry powder, thyme, salt and pepper||Cover and cook on low heat for 30 minutes||Stir occasionally to prevent burning||Serve hot and enjoy',
+        # YouTube video ID - just the part after "watch?v=" in YouTube URL
+        'youtube_id': 'jKaQ9raKnGk'  # STRING - this would be a real cooking video
+    },
+    2: {
+        'id': 2,
+        'name': 'Pancakes',
+        'description': 'Fluffy breakfast pancakes that melt in your mouth',
+        'prep_time': 20,
+        'servings': 4,
+        'difficulty': 'Easy',
+        'category': 'Breakfast',
+        'image': 'https://images.unsplash.com/photo-1567620905732-2d1ec7ab7445?w=800',
+        'ingredients': '2 cups flour||2 eggs||1.5 cups milk||2 tablespoons sugar||2 teaspoons baking powder||1/4 teaspoon salt||3 tablespoons melted butter||1 teaspoon vanilla extract',
+        'instructions': 'Mix flour, sugar, baking powder and salt in a bowl||In another bowl, whisk eggs, milk, butter and vanilla||Pour wet ingredients into dry ingredients||Stir until just combined (don\'t overmix)||Heat a non-stick pan over medium heat||Pour 1/4 cup batter for each pancake||Cook until bubbles form on surface||Flip and cook other side until golden||Serve with syrup and butter',
+        'youtube_id': 'c13ea70V-1Q'
+    },
+    3: {
+        'id': 3,
+        'name': 'Chocolate Cake',
+        'description': 'Rich and moist chocolate cake perfect for celebrations',
+        'prep_time': 60,
+        'servings': 8,
+        'difficulty': 'Hard',
+        'category': 'Dessert',
+        'image': 'https://images.unsplash.com/photo-1578985545062-69928b1d9587?w=800',
+        'ingredients': '2 cups flour||2 cups sugar||3/4 cup cocoa powder||2 teaspoons baking soda||1 teaspoon salt||2 eggs||1 cup milk||1 cup vegetable oil||2 teaspoons vanilla||1 cup boiling water',
+        'instructions': 'Preheat oven to 180°C||Grease and flour two 9-inch cake pans||Mix dry ingredients in large bowl||Add eggs, milk, oil and vanilla||Beat for 2 minutes||Stir in boiling water (batter will be thin)||Pour into prepared pans||Bake for 30-35 minutes||Cool for 10 minutes in pans||Remove from pans and cool completely||Frost with your favorite chocolate frosting',
+        'youtube_id': 'dQw4w9WgXcQ'
+    }
+}
+
+
+# Shopping list page - This is a LIST of DICTIONARIES
+SAMPLE_SHOPPING_ITEMS = [
+    {'id': 1, 'item': 'Rice', 'quantity': '3 cups', 'completed': False},  # BOOLEAN - False means not bought yet
+    {'id': 2, 'item': 'Tomatoes', 'quantity': '4 pieces', 'completed': True},  # True means already bought
+    {'id': 3, 'item': 'Onions', 'quantity': '2 pieces', 'completed': False},
+    {'id': 4, 'item': 'Chicken', 'quantity': '1 kg', 'completed': False},
+]
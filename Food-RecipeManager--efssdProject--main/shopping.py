@@ -0,0 +1,684 @@
+# This file holds the shopping list pages and JSON API as a Flask Blueprint.
+# create_app() in app.py imports and registers it, so nothing here runs
+# until an app is actually being built.
+import sqlite3
+import json
+import queue
+import threading
+from datetime import datetime
+from functools import wraps
+
+from flask import Blueprint, render_template, url_for, request, flash, redirect, session, jsonify, Response, stream_with_context
+
+from db.db import *
+
+
+# All the shopping routes; their endpoint names start with "shopping."
+# e.g. url_for('shopping.shopping')
+shopping_bp = Blueprint('shopping', __name__)
+
+# =============================================================================
+# SHOPPING LIST ROUTES - Fully Interactive with Database
+# =============================================================================
+
+def get_db_connection():
+    """Connect to the SQLite database"""
+    conn = sqlite3.connect('kitchenhub.db')
+    conn.row_factory = sqlite3.Row  # This allows us to access columns by name
+    return conn
+
+def init_shoppingList_db():
+    """Initialize the shopping list database table - run by `flask --app app migrate`"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    # Create shopping_items table if it doesn't exist
+    # Every item belongs to one user (user_id = users.id in db/database.db)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shopping_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            item TEXT NOT NULL,
+            quantity TEXT,
+            category TEXT,
+            completed BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # MIGRATION: older databases have one global list with no user_id column.
+    # Add the column and give the existing items to the admin account.
+    columns = [row['name'] for row in cursor.execute("PRAGMA table_info(shopping_items)")]
+    if 'user_id' not in columns:
+        cursor.execute("ALTER TABLE shopping_items ADD COLUMN user_id INTEGER")
+    cursor.execute("UPDATE shopping_items SET user_id = ? WHERE user_id IS NULL", (legacy_list_owner(),))
+    
+    # Index matches how every list query filters and sorts, so a list page
+    # only reads that user's rows instead of scanning the whole table
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_shopping_items_user
+        ON shopping_items (user_id, completed, created_at DESC)
+    ''')
+    
+    # Insert some sample data if table is empty
+    cursor.execute("SELECT COUNT(*) FROM shopping_items")
+    if cursor.fetchone()[0] == 0:
+        owner = legacy_list_owner()
+        sample_items = [
+            (owner, 'Rice', '3 cups', 'grains', False),
+            (owner, 'Tomatoes', '4 pieces', 'vegetables', True),
+            (owner, 'Onions', '2 pieces', 'vegetables', False),
+            (owner, 'Chicken', '1 kg', 'meat', False),
+            (owner, 'Olive Oil', '1 bottle', 'other', True)
+        ]
+        cursor.executemany('''
+            INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+            VALUES (?, ?, ?, ?, ?)
+        ''', sample_items)
+    
+    conn.commit()
+    conn.close()
+
+def legacy_list_owner():
+    """The user who owns shopping items created before lists were per user"""
+    admin = get_user_by_username('admin')
+    return admin['id'] if admin else 1
+
+# Lazy initialization: if `flask --app app migrate` was never run, the table
+# is set up by the first shopping request in each process instead of at startup
+shopping_db_ready = False
+shopping_db_lock = threading.Lock()
+
+@shopping_bp.before_request
+def ensure_shopping_db():
+    global shopping_db_ready
+    if shopping_db_ready:
+        return
+    with shopping_db_lock:
+        if not shopping_db_ready:
+            init_shoppingList_db()
+            shopping_db_ready = True
+
+def login_required(view):
+    """Send visitors to the login page - shopping lists belong to a user"""
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        if 'user_id' not in session:
+            flash('Please login to access your shopping list', 'warning')
+            return redirect(url_for('main.login'))
+        return view(*args, **kwargs)
+    return wrapped_view
+
+@shopping_bp.route('/shopping/')
+@login_required
+def shopping():
+    # Only the logged-in user's items
+    conn = get_db_connection()
+    items = conn.execute(
+        'SELECT * FROM shopping_items WHERE user_id = ? ORDER BY completed ASC, created_at DESC',
+        (session['user_id'],)
+    ).fetchall()
+    
+    # Calculate live statistics - USING PYTHON!
+    total_items = len(items)  # NUMBER - total count
+    
+    # Using LIST COMPREHENSION and BOOLEAN check
+    completed_items = len([item for item in items if item['completed']])  # Count completed items
+    
+    remaining_items = total_items - completed_items  # NUMBER calculation
+    
+    # Calculate progress percentage
+    if total_items > 0:
+        progress_percentage = (completed_items / total_items) * 100  # MATH operation
+        progress_percentage = round(progress_percentage)  # NUMBER rounding
+    else:
+        progress_percentage = 0
+    
+    conn.close()
+    
+    # USING F-STRING for logging
+    print(f"Shopping List: {completed_items}/{total_items} completed ({progress_percentage}%)")
+    
+    return render_template(
+        'shoppingList.html',
+        title="Shopping List",
+        items=items,
+        total_items=total_items,
+        completed_items=completed_items,
+        remaining_items=remaining_items,
+        progress_percentage=progress_percentage
+    )
+
+@shopping_bp.route('/shopping/add', methods=['POST'])
+@login_required
+def add_shopping_item():
+    """
+    Add new item to shopping list - handles form submission
+    """
+    # Get form data - these are STRINGS from the form
+    item_name = request.form.get('item_name')
+    item_quantity = request.form.get('item_quantity', '1 item')  # Default value
+    item_category = request.form.get('item_category', 'other')   # Default value
+    
+    # Validate input - STRING validation
+    if not item_name or not item_name.strip():
+        flash('Item name is required!', 'danger')
+        return redirect(url_for('shopping.shopping'))
+    
+    # Clean the input
+    item_name = item_name.strip()
+    
+    conn = get_db_connection()
+    
+    # INSERT into database - using SQL with user input
+    conn.execute('''
+        INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (session['user_id'], item_name, item_quantity, item_category, False))  # BOOLEAN value False
+    
+    conn.commit()
+    publish_shopping_event(session['user_id'], 'added', {'stats': shopping_stats(conn, session['user_id'])})
+    conn.close()
+    
+    # USING F-STRING for success message
+    flash(f'✅ "{item_name}" added to shopping list!', 'success')
+    
+    return redirect(url_for('shopping.shopping'))
+
+@shopping_bp.route('/shopping/update/<int:item_id>', methods=['POST'])
+@login_required
+def update_shopping_item(item_id):
+    """
+    Toggle item completion status - mark as complete/incomplete
+    """
+    conn = get_db_connection()
+    
+    # First get the current item to know its name for the flash message
+    # (user_id check means nobody can touch another user's items)
+    item = conn.execute('SELECT * FROM shopping_items WHERE id = ? AND user_id = ?',
+                        (item_id, session['user_id'])).fetchone()
+    
+    if item:
+        # TOGGLE the boolean value - if True becomes False, if False becomes True
+        new_status = not item['completed']  # BOOLEAN operation
+        
+        # UPDATE the database
+        conn.execute('''
+            UPDATE shopping_items 
+            SET completed = ?, updated_at = CURRENT_TIMESTAMP 
+            WHERE id = ? AND user_id = ?
+        ''', (new_status, item_id, session['user_id']))
+        
+        conn.commit()
+        publish_item_updated(conn, item_id)
+        
+        # USING F-STRING for status message
+        status_text = "completed" if new_status else "marked as todo"
+        flash(f'🔄 "{item["item"]}" {status_text}!', 'info')
+    else:
+        flash('Item not found!', 'danger')
+    
+    conn.close()
+    return redirect(url_for('shopping.shopping'))
+
+@shopping_bp.route('/shopping/edit/<int:item_id>', methods=['POST'])
+@login_required
+def edit_shopping_item(item_id):
+    """
+    Edit an existing shopping item
+    """
+    # Get form data - STRINGS from form
+    new_name = request.form.get('item_name')
+    new_quantity = request.form.get('item_quantity')
+    new_category = request.form.get('item_category')
+    
+    # Validate input
+    if not new_name or not new_name.strip():
+        flash('Item name is required!', 'danger')
+        return redirect(url_for('shopping.shopping'))
+    
+    new_name = new_name.strip()
+    
+    conn = get_db_connection()
+    
+    # Get old item data for the flash message
+    old_item = conn.execute('SELECT * FROM shopping_items WHERE id = ? AND user_id = ?',
+                            (item_id, session['user_id'])).fetchone()
+    
+    if old_item:
+        # UPDATE the item in database
+        conn.execute('''
+            UPDATE shopping_items 
+            SET item = ?, quantity = ?, category = ?, updated_at = CURRENT_TIMESTAMP 
+            WHERE id = ? AND user_id = ?
+        ''', (new_name, new_quantity, new_category, item_id, session['user_id']))
+        
+        conn.commit()
+        publish_item_updated(conn, item_id)
+        
+        # USING F-STRING for edit message
+        flash(f'✏️ Updated "{old_item["item"]}" to "{new_name}"!', 'info')
+    else:
+        flash('Item not found!', 'danger')
+    
+    conn.close()
+    return redirect(url_for('shopping.shopping'))
+
+@shopping_bp.route('/shopping/delete/<int:item_id>', methods=['POST'])
+@login_required
+def delete_shopping_item(item_id):
+    """
+    Delete an item from shopping list
+    """
+    conn = get_db_connection()
+    
+    # Get item name before deleting for the flash message
+    item = conn.execute('SELECT * FROM shopping_items WHERE id = ? AND user_id = ?',
+                        (item_id, session['user_id'])).fetchone()
+    
+    if item:
+        # DELETE from database
+        conn.execute('DELETE FROM shopping_items WHERE id = ? AND user_id = ?', (item_id, session['user_id']))
+        conn.commit()
+        publish_shopping_event(session['user_id'], 'deleted',
+                               {'id': item_id, 'stats': shopping_stats(conn, session['user_id'])})
+        
+        # USING F-STRING for delete message
+        flash(f'🗑️ "{item["item"]}" removed from shopping list!', 'warning')
+    else:
+        flash('Item not found!', 'danger')
+    
+    conn.close()
+    return redirect(url_for('shopping.shopping'))
+
+@shopping_bp.route('/shopping/complete_all', methods=['POST'])
+@login_required
+def complete_all_items():
+    """
+    Mark all items as completed
+    """
+    conn = get_db_connection()
+    
+    # COUNT how many items will be updated
+    total_count = conn.execute('SELECT COUNT(*) FROM shopping_items WHERE user_id = ? AND completed = ?',
+                               (session['user_id'], False)).fetchone()[0]
+    
+    if total_count > 0:
+        # UPDATE all incomplete items
+        conn.execute('''
+            UPDATE shopping_items 
+            SET completed = TRUE, updated_at = CURRENT_TIMESTAMP 
+            WHERE user_id = ? AND completed = FALSE
+        ''', (session['user_id'],))
+        conn.commit()
+        publish_shopping_event(session['user_id'], 'refresh', {'stats': shopping_stats(conn, session['user_id'])})
+        
+        # USING F-STRING for completion message
+        flash(f'🎉 All {total_count} items marked as completed!', 'success')
+    else:
+        flash('All items are already completed!', 'info')
+    
+    conn.close()
+    return redirect(url_for('shopping.shopping'))
+
+@shopping_bp.route('/shopping/clear_completed', methods=['POST'])
+@login_required
+def clear_completed_items():
+    """
+    Remove all completed items from the list
+    """
+    conn = get_db_connection()
+    
+    # COUNT how many completed items will be deleted
+    completed_count = conn.execute('SELECT COUNT(*) FROM shopping_items WHERE user_id = ? AND completed = ?',
+                                   (session['user_id'], True)).fetchone()[0]
+    
+    if completed_count > 0:
+        # DELETE all completed items
+        conn.execute('DELETE FROM shopping_items WHERE user_id = ? AND completed = ?', (session['user_id'], True))
+        conn.commit()
+        publish_shopping_event(session['user_id'], 'refresh', {'stats': shopping_stats(conn, session['user_id'])})
+        
+        # USING F-STRING for clear message
+        flash(f'🧹 {completed_count} completed items cleared!', 'info')
+    else:
+        flash('No completed items to clear!', 'info')
+    
+    conn.close()
+    return redirect(url_for('shopping.shopping'))
+
+# Common items for the quick add buttons: (name, category, quantity)
+QUICK_ADD_ITEMS = {
+    'milk': ('Milk', 'dairy', '1 liter'),
+    'bread': ('Bread', 'grains', '1 loaf'),
+    'eggs': ('Eggs', 'dairy', '6 pieces'),
+    'bananas': ('Bananas', 'fruits', '4 pieces'),
+    'potatoes': ('Potatoes', 'vegetables', '5 pieces')
+}
+
+@shopping_bp.route('/shopping/quick_add/<item_name>')
+@login_required
+def quick_add_item(item_name):
+    """
+    Quick add common items (like Milk, Bread, etc.)
+    """
+    if item_name in QUICK_ADD_ITEMS:
+        item_data = QUICK_ADD_ITEMS[item_name]
+        
+        conn = get_db_connection()
+        conn.execute('''
+            INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (session['user_id'], item_data[0], item_data[2], item_data[1], False))
+        conn.commit()
+        publish_shopping_event(session['user_id'], 'added', {'stats': shopping_stats(conn, session['user_id'])})
+        conn.close()
+        
+        flash(f'⚡ {item_data[0]} added to shopping list!', 'success')
+    else:
+        flash('Invalid quick add item!', 'danger')
+    
+    return redirect(url_for('shopping.shopping'))
+
+# =============================================================================
+# SHOPPING LIST JSON API + LIVE UPDATES
+# =============================================================================
+# The page calls these with fetch() so ticking off an item is one small
+# request that returns just that item and the new counters. Every change is
+# also pushed to the user's other open tabs/devices over Server-Sent Events.
+#
+# Note: listeners live in this process's memory, so live updates only reach
+# tabs connected to the same server process.
+
+shopping_listeners = {}  # user_id -> set of queues, one per open stream
+shopping_listeners_lock = threading.Lock()
+
+def publish_shopping_event(user_id, event, data):
+    """Send an event to every open /shopping/stream of this user"""
+    with shopping_listeners_lock:
+        listeners = list(shopping_listeners.get(user_id, ()))
+    for listener in listeners:
+        listener.put((event, data))
+
+def shopping_stats(conn, user_id):
+    """Counters for the stat cards, worked out by SQLite in one query"""
+    row = conn.execute('''
+        SELECT COUNT(*) AS total, COALESCE(SUM(completed), 0) AS done
+        FROM shopping_items WHERE user_id = ?
+    ''', (user_id,)).fetchone()
+    total_items = row['total']
+    completed_items = row['done']
+    return {
+        'total_items': total_items,
+        'completed_items': completed_items,
+        'remaining_items': total_items - completed_items,
+        'progress_percentage': round(completed_items / total_items * 100) if total_items else 0
+    }
+
+def item_to_dict(item):
+    return {
+        'id': item['id'],
+        'item': item['item'],
+        'quantity': item['quantity'],
+        'category': item['category'],
+        'completed': bool(item['completed'])
+    }
+
+def get_user_item(conn, item_id):
+    return conn.execute('SELECT * FROM shopping_items WHERE id = ? AND user_id = ?',
+                        (item_id, session['user_id'])).fetchone()
+
+def publish_item_updated(conn, item_id):
+    """Push the item's new state; returns the same payload for the JSON response"""
+    data = {'item': item_to_dict(get_user_item(conn, item_id)),
+            'stats': shopping_stats(conn, session['user_id'])}
+    publish_shopping_event(session['user_id'], 'updated', data)
+    return data
+
+# Text fields of the JSON API; anything but a string (or leaving it out) is a 400
+TEXT_FIELDS = ('item_name', 'item_quantity', 'item_category')
+
+def invalid_field(data):
+    """Name of the first field with the wrong JSON type, or None if all are fine"""
+    for field in TEXT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return field
+    if data.get('completed') is not None and not isinstance(data['completed'], bool):
+        return 'completed'
+    return None
+
+def api_login_required(view):
+    """Like login_required, but answers with JSON instead of a redirect"""
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify(error='Login required'), 401
+        return view(*args, **kwargs)
+    return wrapped_view
+
+@shopping_bp.route('/shopping/api/items', methods=['POST'])
+@api_login_required
+def api_add_shopping_item():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify(error='Expected a JSON object'), 400
+    bad_field = invalid_field(data)
+    if bad_field:
+        return jsonify(error=f'{bad_field} has the wrong type'), 400
+    item_name = (data.get('item_name') or '').strip()
+    if not item_name:
+        return jsonify(error='Item name is required!'), 400
+    
+    conn = get_db_connection()
+    cursor = conn.execute('''
+        INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (session['user_id'], item_name, data.get('item_quantity', '1 item'), data.get('item_category', 'other'), False))
+    conn.commit()
+    result = {'item': item_to_dict(get_user_item(conn, cursor.lastrowid)),
+              'stats': shopping_stats(conn, session['user_id'])}
+    conn.close()
+    
+    publish_shopping_event(session['user_id'], 'added', result)
+    return jsonify(result), 201
+
+@shopping_bp.route('/shopping/api/items/<int:item_id>', methods=['PATCH'])
+@api_login_required
+def api_update_shopping_item(item_id):
+    """
+    Partial update - send only what changed, e.g. {"completed": true}
+    or {"item_name": "Brown rice"}. Missing fields keep their value.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify(error='Expected a JSON object'), 400
+    # Check the types before using them: a number has no .strip()
+    bad_field = invalid_field(data)
+    if bad_field:
+        return jsonify(error=f'{bad_field} has the wrong type'), 400
+    
+    conn = get_db_connection()
+    item = get_user_item(conn, item_id)
+    if item is None:
+        conn.close()
+        return jsonify(error='Item not found!'), 404
+    
+    completed = data['completed'] if data.get('completed') is not None else bool(item['completed'])
+    name = item['item'] if data.get('item_name') is None else data['item_name'].strip()
+    if not name:
+        conn.close()
+        return jsonify(error='Item name is required!'), 400
+    quantity = data['item_quantity'] if data.get('item_quantity') is not None else item['quantity']
+    category = data['item_category'] if data.get('item_category') is not None else item['category']
+    
+    conn.execute('''
+        UPDATE shopping_items
+        SET item = ?, quantity = ?, category = ?, completed = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND user_id = ?
+    ''', (name, quantity, category, completed, item_id, session['user_id']))
+    conn.commit()
+    result = publish_item_updated(conn, item_id)
+    conn.close()
+    return jsonify(result)
+
+@shopping_bp.route('/shopping/api/items/<int:item_id>', methods=['DELETE'])
+@api_login_required
+def api_delete_shopping_item(item_id):
+    conn = get_db_connection()
+    deleted = conn.execute('DELETE FROM shopping_items WHERE id = ? AND user_id = ?',
+                           (item_id, session['user_id'])).rowcount
+    conn.commit()
+    result = {'id': item_id, 'stats': shopping_stats(conn, session['user_id'])}
+    conn.close()
+    
+    if not deleted:
+        return jsonify(error='Item not found!'), 404
+    publish_shopping_event(session['user_id'], 'deleted', result)
+    return jsonify(result)
+
+@shopping_bp.route('/shopping/api/quick_add/<item_name>', methods=['POST'])
+@api_login_required
+def api_quick_add_item(item_name):
+    if item_name not in QUICK_ADD_ITEMS:
+        return jsonify(error='Invalid quick add item!'), 404
+    name, category, quantity = QUICK_ADD_ITEMS[item_name]
+    
+    conn = get_db_connection()
+    cursor = conn.execute('''
+        INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (session['user_id'], name, quantity, category, False))
+    conn.commit()
+    result = {'item': item_to_dict(get_user_item(conn, cursor.lastrowid)),
+              'stats': shopping_stats(conn, session['user_id'])}
+    conn.close()
+    
+    publish_shopping_event(session['user_id'], 'added', result)
+    return jsonify(result), 201
+
+# Most operations one batch may contain
+MAX_BATCH_OPERATIONS = 500
+
+@shopping_bp.route('/shopping/api/batch', methods=['POST'])
+@api_login_required
+def api_shopping_batch():
+    """
+    Apply many list changes in one round trip and one transaction, e.g.
+    {"operations": [{"op": "add", "item_name": "Milk"},
+                    {"op": "toggle", "id": 3, "completed": true},
+                    {"op": "edit", "id": 4, "item_quantity": "2 kg"},
+                    {"op": "delete", "id": 5}]}
+    Either every operation is applied or none are. Operations are grouped by
+    type and run with executemany in the order add, edit, toggle, delete.
+    Returns the whole list and its counters afterwards.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify(error='Expected a JSON object'), 400
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify(error='operations must be a non-empty list'), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify(error=f'At most {MAX_BATCH_OPERATIONS} operations per batch'), 400
+    
+    user_id = session['user_id']
+    adds, edits, toggles, deletes = [], [], [], []
+    
+    # Validate everything before touching the database
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        bad_field = invalid_field(op) if kind else None
+        if bad_field:
+            return jsonify(error=f'Operation {index}: {bad_field} has the wrong type'), 400
+        if kind == 'add':
+            name = (op.get('item_name') or '').strip()
+            if not name:
+                return jsonify(error=f'Operation {index}: item name is required'), 400
+            adds.append((user_id, name, op.get('item_quantity', '1 item'), op.get('item_category', 'other'), False))
+            continue
+        
+        # bool is an int in Python, so true would otherwise mean item 1
+        item_id = op.get('id')
+        if kind not in ('edit', 'toggle', 'delete') or not isinstance(item_id, int) or isinstance(item_id, bool):
+            return jsonify(error=f'Operation {index}: expected op add/edit/toggle/delete with an integer id'), 400
+        
+        if kind == 'edit':
+            name = op.get('item_name')
+            name = name.strip() or None if isinstance(name, str) else None
+            edits.append((name, op.get('item_quantity'), op.get('item_category'), op['id'], user_id))
+        elif kind == 'toggle':
+            # An explicit "completed" makes replaying a queued offline edit safe;
+            # without it the item is flipped
+            completed = op.get('completed')
+            completed = None if completed is None else bool(completed)
+            toggles.append((completed, completed, op['id'], user_id))
+        else:
+            deletes.append((op['id'], user_id))
+    
+    conn = get_db_connection()
+    try:
+        with conn:  # one transaction: commit on success, roll back on any error
+            conn.executemany('''
+                INSERT INTO shopping_items (user_id, item, quantity, category, completed)
+                VALUES (?, ?, ?, ?, ?)
+            ''', adds)
+            conn.executemany('''
+                UPDATE shopping_items
+                SET item = COALESCE(?, item), quantity = COALESCE(?, quantity),
+                    category = COALESCE(?, category), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND user_id = ?
+            ''', edits)
+            conn.executemany('''
+                UPDATE shopping_items
+                SET completed = CASE WHEN ? IS NULL THEN NOT completed ELSE ? END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND user_id = ?
+            ''', toggles)
+            conn.executemany('DELETE FROM shopping_items WHERE id = ? AND user_id = ?', deletes)
+        
+        items = conn.execute(
+            'SELECT * FROM shopping_items WHERE user_id = ? ORDER BY completed ASC, created_at DESC',
+            (user_id,)
+        ).fetchall()
+        result = {'items': [item_to_dict(item) for item in items],
+                  'stats': shopping_stats(conn, user_id)}
+    finally:
+        conn.close()
+    
+    publish_shopping_event(user_id, 'refresh', {'stats': result['stats']})
+    return jsonify(result)
+
+@shopping_bp.route('/shopping/stream')
+@api_login_required
+def shopping_stream():
+    """Server-Sent Events: one long-lived response per open shopping list page"""
+    user_id = session['user_id']
+    listener = queue.Queue()
+    
+    def events():
+        try:
+            # Registered here rather than in the view: a response dropped
+            # before its first chunk never runs the finally below
+            with shopping_listeners_lock:
+                shopping_listeners.setdefault(user_id, set()).add(listener)
+            # Sent straight away so the browser gets the headers now, and
+            # told to reconnect after 3 seconds if the stream drops
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event, data = listener.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    # and lets us notice when the browser has gone away
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        finally:
+            with shopping_listeners_lock:
+                shopping_listeners[user_id].discard(listener)
+                if not shopping_listeners[user_id]:
+                    del shopping_listeners[user_id]
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import shopping  # noqa: E402
+from app import create_app  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The app with kitchenhub.db in a temporary folder (it is opened from
+    the working directory), set up afresh with the sample items."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(shopping, "shopping_db_ready", False)
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Logged in as the owner of the sample items."""
+    client = app.test_client()
+    with app.app_context():
+        owner = shopping.legacy_list_owner()
+    with client.session_transaction() as session:
+        session["user_id"] = owner
+    return client
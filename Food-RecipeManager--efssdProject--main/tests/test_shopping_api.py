@@ -0,0 +1,75 @@
+import pytest
+from werkzeug.test import EnvironBuilder
+
+import shopping
+
+
+def item_names(client):
+    response = client.post('/shopping/api/batch', json={'operations': [{'op': 'add', 'item_name': 'Probe'}]})
+    return {item['item'] for item in response.get_json()['items']}
+
+
+@pytest.mark.parametrize('body', [[], [{'op': 'delete', 'id': 1}], 'operations', 3])
+def test_batch_rejects_non_object_body(client, body):
+    response = client.post('/shopping/api/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Expected a JSON object'
+
+
+@pytest.mark.parametrize('op', [
+    {'op': 'delete', 'id': True},
+    {'op': 'toggle', 'id': False},
+    {'op': 'edit', 'id': True, 'item_name': 'Renamed'},
+    {'op': 'edit', 'id': '1', 'item_name': 'Renamed'},
+])
+def test_batch_rejects_non_integer_ids(client, op):
+    before = item_names(client)
+    response = client.post('/shopping/api/batch', json={'operations': [op]})
+    assert response.status_code == 400
+    assert 'integer id' in response.get_json()['error']
+    assert item_names(client) == before
+
+
+def test_batch_rejects_wrong_field_types(client):
+    response = client.post('/shopping/api/batch', json={'operations': [{'op': 'add', 'item_name': 5}]})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Operation 0: item_name has the wrong type'
+
+
+def first_item(client):
+    response = client.post('/shopping/api/batch', json={'operations': [{'op': 'add', 'item_name': 'Milk'}]})
+    return next(item for item in response.get_json()['items'] if item['item'] == 'Milk')
+
+
+@pytest.mark.parametrize('name', ['', '   '])
+def test_patch_rejects_blank_name(client, name):
+    item = first_item(client)
+    response = client.patch(f"/shopping/api/items/{item['id']}", json={'item_name': name})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Item name is required!'
+
+
+def test_patch_without_name_keeps_it(client):
+    item = first_item(client)
+    response = client.patch(f"/shopping/api/items/{item['id']}", json={'completed': True})
+    assert response.status_code == 200
+    assert response.get_json()['item']['item'] == 'Milk'
+
+
+def test_stream_dropped_before_reading_leaves_no_listener(app, client):
+    # Called as a WSGI app, since the test client reads the first chunk itself
+    cookie = client.get_cookie('session')
+    environ = EnvironBuilder(path='/shopping/stream',
+                             headers={'Cookie': f'session={cookie.value}'}).get_environ()
+    body = app.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+    body.close()
+    assert shopping.shopping_listeners == {}
+
+
+def test_stream_listener_goes_with_the_stream(client):
+    response = client.get('/shopping/stream', buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks) == b'retry: 3000\n\n'
+    assert len(shopping.shopping_listeners) == 1
+    response.close()
+    assert shopping.shopping_listeners == {}
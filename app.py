@@ -1,35 +1,163 @@
-from flask import Flask, render_template, url_for, request, flash, redirect, session
+import json
+import os
+
+from flask import (
+    Flask, render_template, stream_template, url_for, request, flash, redirect, session,
+    get_flashed_messages, jsonify, Response, stream_with_context, send_file, send_from_directory, abort
+)
 from flask_wtf import CSRFProtect
-from flask_wtf.csrf import generate_csrf
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from config import get_config
+from catalog import RecipeCatalog, SORT_KEYS
+from fragment_cache import FragmentCacheExtension, invalidate_recipes
+from rate_limit import SQLiteStore, rate_limiter
+from uploads import UploadRequest, store_image, MAX_UPLOAD_BYTES
+from profiling import RequestProfiler
+from compression import CompressionMiddleware
+from sitemap import SitemapCache
+from warmup import HotSet, is_warmup
+from db.jobs import job_worker, get_job_counts, get_recent_jobs
 
 # Import DB logic
 from db.db import (
     create_user, validate_login, get_user_by_username,
-    get_all_recipes, get_recipe_by_id,
-    create_recipe, update_recipe, delete_recipe,
-    get_recipe_ingredients, update_recipe_ingredients, delete_recipe_ingredients
+    get_all_recipes, get_recipe_by_id, get_recipes_page, iter_recipes, get_catalog_rows, RECIPE_FIELDS,
+    iter_sitemap_rows, get_max_recipe_id, get_recent_recipes,
+    get_leaderboard, LEADERBOARDS, record_upload, get_upload, get_changed_recipe_ids,
+    record_view, get_most_viewed, get_recipe_stats,
+    create_recipe, update_recipe, delete_recipe, bulk_delete_recipes, bulk_update_recipes,
+    get_recipe_ingredients, update_recipe_ingredients,
+    fuzzy_search_recipes, on_recipe_change, enable_read_snapshot, enable_method_compression,
+    migrate
 )
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'
-csrf = CSRFProtect(app)
 
+# File parts of multipart forms are streamed to the upload store as they are
+# parsed (uploads.py); the cap leaves room for the form's other fields
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 1024 * 1024
+
+# Compiled templates are kept on disk so new workers skip recompiling them.
+# jinja_options must be set before app.jinja_env is first used (CSRFProtect uses it).
+JINJA_CACHE_DIR = os.path.join(app.instance_path, 'jinja_cache')
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_options = {
+    **app.jinja_options,
+    'bytecode_cache': FileSystemBytecodeCache(JINJA_CACHE_DIR),
+    'extensions': [FragmentCacheExtension],
+}
 
-# CONTEXT PROCESSORS
-@app.context_processor
-def inject_csrf_token():
-    return dict(csrf_token=generate_csrf())
+csrf = CSRFProtect(app)
 
-@app.context_processor
-def inject_site_name():
-    return dict(siteName="KitchenHub")
+# Admins can profile any single request with ?_profile=1 (profiling.py)
+profiler = RequestProfiler(
+    os.path.join(app.instance_path, 'profiles'),
+    allowed=lambda: session.get('username') == 'admin'
+)
+profiler.init_app(app)
+
+# Drop cached recipe cards whenever a recipe changes
+on_recipe_change(invalidate_recipes)
+
+# Columnar copy of the catalog for sorting and top-k ranking (catalog.py).
+# Other workers' writes are read from the change log every couple of seconds.
+recipe_catalog = RecipeCatalog(get_catalog_rows, sync_interval=2, load_changes=get_changed_recipe_ids)
+on_recipe_change(recipe_catalog.refresh)
+
+# Sitemap and Atom feed files, rewritten per chunk as the change log shows edits (sitemap.py)
+sitemaps = SitemapCache(
+    os.path.join(app.instance_path, 'sitemap'),
+    iter_rows=iter_sitemap_rows,
+    load_max_id=get_max_recipe_id,
+    load_recent=get_recent_recipes,
+    load_changes=get_changed_recipe_ids
+)
+
+# Most requested pages are saved now and then and replayed when a worker
+# starts, so caches are warm soon after a deploy (warmup.py)
+hot_set = HotSet(
+    os.path.join(app.instance_path, 'hot_set.json'),
+    endpoints=('home', 'recipes', 'recipe', 'search')
+)
+hot_set.init_app(app)
+
+
+# BACKGROUND JOBS
+# Started lazily so each forked server worker runs its own job threads
+@app.before_request
+def start_job_worker():
+    job_worker.ensure_started()
+
+
+# TEMPLATE GLOBALS
+# Set once rather than by context processors run on every render. Forms call
+# csrf_token() (Flask-WTF's global), so a token, and the session cookie that
+# holds it, is only made for pages that have a form.
+app.jinja_env.globals['siteName'] = "KitchenHub"
+
+
+# SHARED CACHING
+# Visitors without a session all get the same bytes for these pages, so
+# shared caches (a CDN or reverse proxy) may keep them for
+# PUBLIC_CACHE_SECONDS. Flask adds Vary: Cookie, so logged-in users never
+# get a stored copy. Recipe pages are left out: a cache hit wouldn't be
+# counted as a view.
+PUBLIC_CACHE_ENDPOINTS = {'home', 'recipes', 'about'}
+
+@app.after_request
+def allow_shared_caching(response):
+    max_age = app.config.get('PUBLIC_CACHE_SECONDS', 0)
+    if (max_age and request.method == 'GET' and response.status_code == 200
+            and request.endpoint in PUBLIC_CACHE_ENDPOINTS
+            and not session and not session.modified
+            and 'Cache-Control' not in response.headers):
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+# STREAMED PAGES
+# Long listings are sent while they render, so the browser gets the <head>
+# and the first cards before the last card is built. Jinja yields tiny
+# pieces; they are joined into STREAM_CHUNK_SIZE chunks before going out.
+STREAM_CHUNK_SIZE = 8 * 1024
+
+def stream_page(template, **context):
+    # The session cookie is sent before the body, so anything the template
+    # would change in the session must happen now: reading the flashed
+    # messages pops them (the template gets the same list back). Streamed
+    # templates mustn't call csrf_token(), which may store a new token.
+    get_flashed_messages()
+    chunks = stream_template(template, **context)
+
+    def generate():
+        buffered, size = [], 0
+        for chunk in chunks:
+            buffered.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_CHUNK_SIZE:
+                yield ''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield ''.join(buffered)
+
+    return Response(generate(), mimetype='text/html')
 
 
 # BASIC PAGES
+HOME_BOARD_SIZE = 5
+
 @app.route('/')
 def home():
     username = session.get('username', 'Guest')
-    return render_template('home.html', title="Welcome", username=username)
+    # Precomputed boards: k index reads each, no sort over recipes
+    return render_template('home.html', title="Welcome", username=username,
+                           top_rated=get_leaderboard('top_rated', limit=HOME_BOARD_SIZE),
+                           quickest=get_leaderboard('quickest', limit=HOME_BOARD_SIZE))
 
 @app.route('/about/')
 def about():
@@ -55,8 +183,17 @@ def contact():
     return render_template('contact.html', title="Contact Us")
 
 
+# RATE LIMITS (count, period in seconds)
+# Login and register hash passwords with PBKDF2, which is slow on purpose;
+# search runs several index queries. Only POSTs are limited on the forms.
+LOGIN_LIMIT = (10, 60)
+LOGIN_USERNAME_LIMIT = (5, 60)
+REGISTER_LIMIT = (5, 60)
+SEARCH_LIMIT = (30, 60)
+
 # REGISTER
 @app.route('/register/', methods=('GET', 'POST'))
+@rate_limiter.limit('register', *REGISTER_LIMIT, methods=('POST',))
 def register():
 
     if request.method == 'POST':
@@ -88,6 +225,7 @@ def register():
 
 # LOGIN
 @app.route('/login/', methods=('GET', 'POST'))
+@rate_limiter.limit('login', *LOGIN_LIMIT, per_username=LOGIN_USERNAME_LIMIT, methods=('POST',))
 def login():
 
     if request.method == 'POST':
@@ -134,8 +272,14 @@ def shoppingList():
 # RECIPES LIST  
 @app.route('/recipes/')
 def recipes():
-    recipes_list = get_all_recipes()
-    return render_template('recipes.html', title="All Recipes", recipes=recipes_list)
+    # ?sort=rating|quickest|... ranks in memory; the default A-Z order comes from SQL
+    sort = request.args.get('sort')
+    if sort in SORT_KEYS:
+        recipes_list = recipe_catalog.top_k(sort, k=len(recipe_catalog), include_missing=True)
+    else:
+        sort = None
+        recipes_list = get_all_recipes()
+    return stream_page('recipes.html', title="All Recipes", recipes=recipes_list, sort=sort)
 
 # RECIPE DETAIL
 @app.route('/recipe/<int:id>/')
@@ -147,12 +291,16 @@ def recipe(id):
         return redirect(url_for('recipes'))
 
     recipe, ingredients, ingredient_ids = data
+    # Counted in memory; written to recipe_stats in batches
+    if not is_warmup():
+        record_view(id)
 
     return render_template(
         'recipe.html',
         title=recipe['name'],
         recipe=recipe,
-        ingredients=ingredients
+        ingredients=ingredients,
+        poster=get_upload(recipe['poster'])
     )
 
 # CREATE RECIPE  
@@ -164,7 +312,6 @@ def create():
         cook_time = request.form.get('cook_time', '').strip()
         prep_time = request.form.get('prep_time', '').strip()
         portion = request.form.get('portion', '').strip()
-        poster = request.form.get('poster', '').strip()
         cuisine = request.form.get('cuisine', '').strip()
         rating = request.form.get('rating', '').strip()
         review = request.form.get('review', '').strip()
@@ -173,6 +320,17 @@ def create():
             flash('Recipe name is required!', 'danger')
             return render_template('create.html', title="Add a Recipe")
 
+        poster = ''
+        poster_file = request.files.get('poster')
+        if poster_file and poster_file.filename:
+            try:
+                upload = store_image(poster_file)
+            except ValueError as e:
+                flash(str(e), 'danger')
+                return render_template('create.html', title="Add a Recipe")
+            record_upload(upload)
+            poster = upload['url']
+
         rating_value = int(rating) if rating.isdigit() else None
 
         create_recipe(name, method, cook_time, prep_time, portion, poster, cuisine, rating_value, review)
@@ -205,8 +363,11 @@ def update(id):
             flash('Recipe name is required!', 'danger')
             return render_template('update.html', recipe=recipe, ingredients=ingredients)
 
+        # Blank or non-numeric ratings are stored as "no rating", as on create
+        rating_value = int(rating) if rating.isdigit() else None
+
         # Update recipe fields
-        update_recipe(id, name, prep_time, cook_time, cuisine, rating, review)
+        update_recipe(id, name, prep_time, cook_time, cuisine, rating_value, review)
 
         flash('Recipe updated successfully!', 'success')
         return redirect(url_for('recipe', id=id))
@@ -217,7 +378,7 @@ def update(id):
 @app.route('/delete/<int:id>', methods=('POST',))
 def delete(id):
 
-    delete_recipe_ingredients(id)
+    # Ingredient links are removed by ON DELETE CASCADE
     delete_recipe(id)
 
     flash('Recipe deleted successfully!', 'success')
@@ -225,20 +386,283 @@ def delete(id):
 
 # SEARCH RECIPES
 @app.route('/search')
+@rate_limiter.limit('search', *SEARCH_LIMIT)
 def search():
-    from db.db import search_recipes
     query = request.args.get('q', '').strip()
     # If search bar is empty when button is pressed, this will show nothing
     if not query:
         return render_template("search.html", recipes=[], query=query)
     
-    recipes = search_recipes(query)
+    # Typo-tolerant, best match first, with a "did you mean" suggestion
+    recipes, suggestion = fuzzy_search_recipes(query)
+
+    return stream_page('search.html', recipes=recipes, query=query, suggestion=suggestion)
+
+# JOB STATUS (admin only)
+@app.route('/admin/jobs/')
+def admin_jobs():
+    if session.get('username') != 'admin':
+        flash('Only the admin can view background jobs.', 'warning')
+        return redirect(url_for('home'))
+
+    return render_template(
+        'jobs.html',
+        title="Background Jobs",
+        counts=get_job_counts(),
+        jobs=get_recent_jobs()
+    )
+
+
+# PROFILES (admin only)
+@app.route('/admin/profiles/')
+def admin_profiles():
+    if session.get('username') != 'admin':
+        flash('Only the admin can view profiles.', 'warning')
+        return redirect(url_for('home'))
+
+    return render_template('profiles.html', title="Request Profiles", profiles=profiler.list_profiles())
+
+
+@app.route('/admin/profiles/<name>')
+def admin_profile_file(name):
+    if session.get('username') != 'admin':
+        abort(404)
+    return send_from_directory(profiler.output_dir, name, as_attachment=True)
+
+
+# SITEMAP AND FEED
+def _send_cached(f, mimetype):
+    stat = os.fstat(f.fileno())
+    return send_file(
+        f, mimetype=mimetype, conditional=True,
+        etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}", last_modified=stat.st_mtime
+    )
+
+@app.route('/sitemap.xml')
+def sitemap():
+    return _send_cached(sitemaps.sitemap(), 'application/xml')
+
+@app.route('/sitemap-<int:n>.xml')
+def sitemap_chunk(n):
+    f = sitemaps.chunk(n)
+    if f is None:
+        abort(404)
+    return _send_cached(f, 'application/xml')
+
+@app.route('/feed.atom')
+def feed():
+    return _send_cached(sitemaps.feed(), 'application/atom+xml')
+
+
+# JSON API
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+
+def _api_fields():
+    """Parse ?fields=a,b,c; returns None for all columns or raises ValueError."""
+    raw = request.args.get('fields', '').strip()
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in RECIPE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def _api_error(message, status=400):
+    return jsonify(error=message), status
+
+
+@app.route('/api/v1/recipes')
+def api_recipes():
+    try:
+        fields = _api_fields()
+    except ValueError as e:
+        return _api_error(str(e))
+
+    cuisine = request.args.get('cuisine', '').strip() or None
+    min_rating = request.args.get('min_rating', type=int)
+
+    # Whole catalog as newline-delimited JSON, one row at a time
+    wanted = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+    if wanted == 'application/x-ndjson':
+        def generate():
+            for row in iter_recipes(fields, cuisine, min_rating):
+                yield json.dumps(dict(row)) + "\n"
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    cursor = request.args.get('cursor', 0, type=int)
+    limit = request.args.get('limit', API_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, API_MAX_PAGE_SIZE))
+
+    rows, next_cursor = get_recipes_page(fields, cursor, limit, cuisine, min_rating)
+    return jsonify(
+        data=[dict(row) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+@app.route('/api/v1/recipes/top')
+def api_top_recipes():
+    """Top k recipes by ?by=rating|quickest|prep_time|cook_time|portion|kcal,
+    optionally filtered by cuisine, min_rating and max_time (minutes)."""
+    by = request.args.get('by', 'rating')
+    if by not in SORT_KEYS:
+        return _api_error(f"by must be one of: {', '.join(SORT_KEYS)}")
+
+    k = max(1, min(request.args.get('k', 10, type=int), API_MAX_PAGE_SIZE))
+    cards = recipe_catalog.top_k(
+        by, k,
+        cuisine=request.args.get('cuisine', '').strip() or None,
+        min_rating=request.args.get('min_rating', type=float),
+        max_total_time=request.args.get('max_time', type=float)
+    )
+    return jsonify(data=[{field: card[field] for field in card.__slots__} for card in cards])
+
+
+@app.route('/api/v1/recipes/most-viewed')
+def api_most_viewed():
+    """Most viewed recipes, as of the last view count flush (db/stats.py)."""
+    limit = max(1, min(request.args.get('limit', 10, type=int), API_MAX_PAGE_SIZE))
+    return jsonify(data=[dict(row) for row in get_most_viewed(limit)])
+
+
+@app.route('/api/v1/recipes/<int:id>/stats')
+def api_recipe_stats(id):
+    stats = get_recipe_stats(id)
+    if stats is None and not get_recipe_by_id(id):
+        return _api_error('Recipe not found', 404)
+    return jsonify(
+        recipe_id=id,
+        views=stats['views'] if stats else 0,
+        last_viewed_at=stats['last_viewed_at'] if stats else None
+    )
+
+
+@app.route('/api/v1/leaderboards/<board>')
+def api_leaderboard(board):
+    """?cuisine= for one cuisine's board, ?limit= up to the board size."""
+    if board not in LEADERBOARDS:
+        return _api_error(f"board must be one of: {', '.join(LEADERBOARDS)}", 404)
+    rows = get_leaderboard(
+        board,
+        cuisine=request.args.get('cuisine', '').strip() or None,
+        limit=max(1, request.args.get('limit', API_PAGE_SIZE, type=int))
+    )
+    return jsonify(data=[dict(row) for row in rows])
+
+
+@app.route('/api/v1/recipes/<int:id>')
+def api_recipe(id):
+    try:
+        fields = _api_fields()
+    except ValueError as e:
+        return _api_error(str(e))
+
+    data = get_recipe_by_id(id)
+    if not data:
+        return _api_error('Recipe not found', 404)
+
+    recipe, ingredients, ingredient_ids = data
+    result = {k: recipe[k] for k in (fields or RECIPE_FIELDS)}
+    result['ingredients'] = [dict(ing) for ing in ingredients]
+    return jsonify(result)
+
+
+# APP FACTORY
+def create_app(config_name=None):
+    """Apply the chosen config (see config.py) to the app and return it."""
+    app.config.from_object(get_config(config_name))
+    job_worker.threads = app.config['JOB_THREADS']
+    hot_set.enabled = app.config['WARMUP']
+    hot_set.concurrency = app.config['WARMUP_CONCURRENCY']
+    if app.config['READ_SNAPSHOT']:
+        enable_read_snapshot()
+    if app.config['COMPRESS_METHOD']:
+        enable_method_compression()
+    rate_limiter.enabled = app.config['RATE_LIMIT']
+    if app.config['RATE_LIMIT_STORE'] == 'sqlite':
+        rate_limiter.store = SQLiteStore()
+    # Middleware is stacked on the bare app each time, so calling
+    # create_app again replaces it rather than wrapping it twice
+    wsgi_app = app.extensions.setdefault('bare_wsgi_app', app.wsgi_app)
+    if app.config['COMPRESS_RESPONSES']:
+        wsgi_app = CompressionMiddleware(
+            wsgi_app,
+            min_size=app.config['COMPRESS_MIN_SIZE'],
+            gzip_level=app.config['GZIP_LEVEL'],
+            brotli_level=app.config['BROTLI_LEVEL'],
+        )
+    hops = app.config['TRUSTED_PROXIES']
+    if hops:
+        # Outermost, so everything below sees the client's address and scheme
+        wsgi_app = ProxyFix(wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    app.wsgi_app = wsgi_app
+    return app
+
+
+# SCHEMA MIGRATION
+# Run once per deploy so workers don't have to check the schema as they start
+@app.cli.command('migrate')
+def migrate_command():
+    """Bring db/database.db up to the current schema."""
+    version = migrate()
+    print(f"Database schema is at version {version}.")
+
+
+# BULK ADMIN API
+# {"action": "delete" | "cuisine" | "rating", "ids": [...], "cuisine": ..., "rating": ...}
+# Each action is one statement in one transaction, however many ids are sent.
+BULK_MAX_IDS = 10000
+
+
+@app.route('/api/v1/admin/recipes/bulk', methods=('POST',))
+def api_bulk_recipes():
+    if session.get('username') != 'admin':
+        return _api_error('Admin only', 403)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _api_error('Expected a JSON object')
+    action = data.get('action')
+    ids = data.get('ids')
+
+    # bool is an int in Python, so true/false would otherwise mean ids 1/0
+    if (not isinstance(ids, list) or not ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return _api_error('ids must be a non-empty list of integers')
+    if len(ids) > BULK_MAX_IDS:
+        return _api_error(f'At most {BULK_MAX_IDS} ids per request')
+
+    if action == 'delete':
+        count = bulk_delete_recipes(ids)
+    elif action == 'cuisine':
+        cuisine = (data.get('cuisine') or '').strip()
+        if not cuisine:
+            return _api_error('cuisine is required')
+        count = bulk_update_recipes(ids, cuisine=cuisine)
+    elif action == 'rating':
+        rating = data.get('rating')
+        if not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5:
+            return _api_error('rating must be an integer from 1 to 5')
+        count = bulk_update_recipes(ids, rating=rating)
+    else:
+        return _api_error("action must be 'delete', 'cuisine' or 'rating'")
+
+    return jsonify(action=action, affected=count)
 
-    return render_template('search.html', recipes=recipes, query=query)
 
 # RUN APP
+# Development server only; use serve.py for production
 if __name__ == '__main__':
+    create_app()
     print("Starting Flask application...")
-    print("Open Your Application in Your Browser: http://localhost:81")
-    app.run(host='0.0.0.0', port=81, debug=True)
-
+    print(f"Open Your Application in Your Browser: http://localhost:{app.config['PORT']}")
+    app.run(
+        host=app.config['HOST'],
+        port=app.config['PORT'],
+        debug=app.config['DEBUG'],
+        use_reloader=app.config['USE_RELOADER']
+    )
@@ -0,0 +1,171 @@
+"""Online backups of the KitchenHub databases.
+
+    python backup.py [DB ...] [--dest DIR] [--keep N] [--compress] [--pages N] [--every SECONDS]
+
+Copies each database with the SQLite online backup API while the app keeps
+running: a few pages are copied per step and the source is only locked
+during a step, so writers wait at most one step. If a writer changes the
+database mid-copy, SQLite restarts the copy, so the result is always a
+consistent snapshot. The copy is checked with PRAGMA integrity_check before
+it replaces anything, optionally gzipped, and only the newest --keep
+snapshots of each database are kept.
+
+With --every the command keeps running and takes a backup on that interval
+(SIGTERM/SIGINT stop it between runs); without it, it backs up once.
+"""
+import argparse
+import glob
+import gzip
+import os
+import shutil
+import signal
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from config import get_config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATABASES = [
+    os.path.join(BASE_DIR, "db", "database.db"),
+    os.path.join(BASE_DIR, "Food-RecipeManager--efssdProject--main", "kitchenhub.db"),
+]
+
+PAGES_PER_STEP = 256          # 1 MB a step with 4 KB pages
+STEP_SLEEP = 0.005            # seconds between steps, for writers to get in
+
+
+class BackupError(Exception):
+    pass
+
+
+def _copy(src_path, dest_path, pages, sleep):
+    """Online backup; returns (bytes copied, seconds, longest step in seconds)."""
+    steps = []
+    last = None
+
+    def progress(status, remaining, total):
+        # Runs after every step, while no lock is held
+        nonlocal last
+        steps.append(time.perf_counter() - last)
+        if remaining:
+            time.sleep(sleep)
+        last = time.perf_counter()
+
+    if not os.path.exists(src_path):
+        raise BackupError(f"{src_path} does not exist")
+    start = time.perf_counter()
+    src = sqlite3.connect(src_path, timeout=30)
+    dest = sqlite3.connect(dest_path)
+    try:
+        last = time.perf_counter()
+        src.backup(dest, pages=pages, progress=progress)
+        page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+        page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        result = dest.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        src.close()
+        dest.close()
+    if result != "ok":
+        raise BackupError(f"integrity_check failed on the copy of {src_path}: {result}")
+    return page_size * page_count, time.perf_counter() - start, max(steps, default=0)
+
+
+def backup_database(src_path, dest_dir, keep=7, compress=False, pages=PAGES_PER_STEP, sleep=STEP_SLEEP):
+    """Take one verified snapshot of src_path into dest_dir; returns its stats."""
+    os.makedirs(dest_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(src_path))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    final = os.path.join(dest_dir, f"{name}-{stamp}.db" + (".gz" if compress else ""))
+    partial = os.path.join(dest_dir, f".{name}-{stamp}.db.partial")
+
+    try:
+        size, seconds, longest_step = _copy(src_path, partial, pages, sleep)
+        if compress:
+            with open(partial, "rb") as raw, gzip.open(final + ".partial", "wb", compresslevel=6) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.replace(final + ".partial", final)
+            os.unlink(partial)
+        else:
+            os.replace(partial, final)
+    finally:
+        for leftover in (partial, final + ".partial"):
+            if os.path.exists(leftover):
+                os.unlink(leftover)
+
+    removed = _rotate(dest_dir, name, keep)
+    return {
+        "database": src_path,
+        "snapshot": final,
+        "bytes": size,
+        "stored_bytes": os.path.getsize(final),
+        "seconds": seconds,
+        "mb_per_second": size / seconds / 1e6 if seconds else 0,
+        "longest_pause_ms": longest_step * 1000,
+        "removed": removed,
+    }
+
+
+def _rotate(dest_dir, name, keep):
+    # Timestamps sort in name order, newest last
+    snapshots = sorted(glob.glob(os.path.join(dest_dir, f"{name}-*.db")) +
+                       glob.glob(os.path.join(dest_dir, f"{name}-*.db.gz")),
+                       key=os.path.basename)
+    old = snapshots[:-keep] if keep > 0 else []
+    for path in old:
+        os.unlink(path)
+    return len(old)
+
+
+def run_backups(databases, dest_dir, keep, compress, pages):
+    failed = False
+    for path in databases:
+        try:
+            stats = backup_database(path, dest_dir, keep, compress, pages)
+        except (sqlite3.Error, OSError, BackupError) as e:
+            print(f"[backup] {path}: FAILED: {e}", file=sys.stderr, flush=True)
+            failed = True
+            continue
+        print(f"[backup] {os.path.basename(path)} -> {os.path.basename(stats['snapshot'])}: "
+              f"{stats['bytes'] / 1e6:.2f} MB in {stats['seconds']:.2f}s "
+              f"({stats['mb_per_second']:.1f} MB/s), longest pause {stats['longest_pause_ms']:.1f} ms, "
+              f"stored {stats['stored_bytes'] / 1e6:.2f} MB, rotated out {stats['removed']}", flush=True)
+    return not failed
+
+
+def main(argv=None):
+    config = get_config(os.environ.get("KITCHENHUB_ENV", "production"))
+
+    parser = argparse.ArgumentParser(description="Back up the KitchenHub databases while the app runs.")
+    parser.add_argument("databases", nargs="*", default=DATABASES, help="database files (default: both apps')")
+    parser.add_argument("--dest", default=config.BACKUP_DIR, help="directory for the snapshots")
+    parser.add_argument("--keep", type=int, default=config.BACKUP_KEEP, help="snapshots kept per database")
+    parser.add_argument("--compress", action="store_true", help="gzip the snapshots")
+    parser.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages copied per step")
+    parser.add_argument("--every", type=int, metavar="SECONDS", help="keep running, backing up on this interval")
+    args = parser.parse_args(argv)
+
+    if not args.every:
+        return 0 if run_backups(args.databases, args.dest, args.keep, args.compress, args.pages) else 1
+
+    stop = False
+
+    def request_stop(signum, frame):
+        nonlocal stop
+        stop = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    next_run = time.monotonic()
+    while not stop:
+        if time.monotonic() >= next_run:
+            run_backups(args.databases, args.dest, args.keep, args.compress, args.pages)
+            next_run += args.every
+        time.sleep(min(1, max(0, next_run - time.monotonic())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
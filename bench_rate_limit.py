@@ -0,0 +1,50 @@
+"""Overhead of the rate limiter (rate_limit.py) per request.
+
+    python bench_rate_limit.py [--hits N]
+
+Times RateLimiter.check() on its own for both stores, spread over many keys
+the way real client IPs would be, and next to it the time of one plain
+request through the Flask test client for scale.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from rate_limit import MemoryStore, RateLimiter, SQLiteStore
+
+KEYS = 5000
+
+
+def time_checks(limiter, hits):
+    start = time.perf_counter()
+    for n in range(hits):
+        # Generous limit so every check takes the normal, allowed path
+        limiter.check("bench", f"10.0.{n % KEYS // 256}.{n % 256}", 1000, 1)
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def time_request(hits):
+    from app import app
+    client = app.test_client()
+    client.get("/about/")
+    start = time.perf_counter()
+    for _ in range(hits):
+        client.get("/about/")
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    shared = os.path.join(tempfile.mkdtemp(), "ratelimit.db")
+    print(f"memory store      {time_checks(RateLimiter(MemoryStore()), args.hits):8.1f} us/check")
+    print(f"sqlite store      {time_checks(RateLimiter(SQLiteStore(shared)), args.hits):8.1f} us/check")
+    print(f"plain request     {time_request(max(1, args.hits // 10)):8.1f} us/request (for comparison)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
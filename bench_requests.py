@@ -0,0 +1,51 @@
+"""Per-request overhead of anonymous page views.
+
+    python bench_requests.py [--requests N]
+
+Serves each page N times through the Flask test client as a visitor without
+a session cookie, and reports the median time per request and whether the
+response sets a cookie or may be stored by a shared cache. A page that sets
+a cookie for an anonymous visitor can't be served from a shared cache.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+PAGES = ["/", "/about/", "/recipes/", "/recipes/?sort=rating", "/search?q=pasta", "/login/"]
+
+
+def time_page(client, path, requests):
+    client.get(path)    # compile templates and warm caches first
+    times = []
+    for _ in range(requests):
+        client.delete_cookie("session")
+        start = time.perf_counter()
+        response = client.get(path)
+        response.get_data()     # streamed pages render while being read
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6, response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app("production")
+    # Search is rate limited per IP, and every request here comes from one
+    app.config["RATE_LIMIT"] = False
+    from rate_limit import rate_limiter
+    rate_limiter.enabled = False
+    client = app.test_client()
+
+    print(f"{'page':<24} {'us/request':>11}  {'Set-Cookie':<10}  Cache-Control")
+    for path in PAGES:
+        us, response = time_page(client, path, args.requests)
+        cookie = "yes" if "Set-Cookie" in response.headers else "no"
+        print(f"{path:<24} {us:>11.1f}  {cookie:<10}  {response.headers.get('Cache-Control', '-')}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Cold-start benchmark: import + app factory + first request, in fresh processes.
+
+    python bench_startup.py [--runs N]
+
+Each run starts a new Python interpreter (so nothing is already imported or
+compiled in memory), imports the app module, builds the app and serves one
+request through the test client. Reports the median of each phase in
+milliseconds for the main app and the legacy app.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEGACY_DIR = os.path.join(BASE_DIR, "Food-RecipeManager--efssdProject--main")
+
+# Runs inside the child process; prints one JSON line of timings
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app as module
+t1 = time.perf_counter()
+application = module.create_app({config})
+t2 = time.perf_counter()
+response = application.test_client().get({path!r})
+t3 = time.perf_counter()
+assert response.status_code < 500, response.status_code
+print(json.dumps({{"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2}}))
+"""
+
+TARGETS = [
+    # name, working directory, create_app() argument, first request path
+    ("main", BASE_DIR, "'production'", "/recipes/"),
+    ("legacy", LEGACY_DIR, "", "/login/"),
+]
+
+
+def run_once(cwd, config, path):
+    env = dict(os.environ, KITCHENHUB_JOB_THREADS="0")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(config=config, path=path)],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'app':<8} {'import':>9} {'create_app':>11} {'first req':>10} {'total':>9}   (median ms of {args.runs} runs)")
+    for name, cwd, config, path in TARGETS:
+        runs = [run_once(cwd, config, path) for _ in range(args.runs)]
+        phases = {phase: statistics.median(run[phase] for run in runs) * 1000 for phase in runs[0]}
+        total = statistics.median(sum(run.values()) for run in runs) * 1000
+        print(f"{name:<8} {phases['import']:>9.1f} {phases['create_app']:>11.1f} "
+              f"{phases['first_request']:>10.1f} {total:>9.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
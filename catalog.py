@@ -0,0 +1,234 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+
+__all__ = [
+    "RecipeCard",
+    "RecipeCatalog",
+    "SORT_KEYS"
+]
+
+# IN-PROCESS RECIPE CATALOG
+# Numeric recipe fields are kept column by column in typed arrays (8 bytes
+# per value, no per-row Python objects), and display fields in one small
+# __slots__ object per recipe. Sorting, filtering and top-k ranking then run
+# over the arrays in memory instead of asking SQLite to sort the table for
+# every request.
+
+NAN = float("nan")
+
+# sort key -> (numeric column, largest first?)
+SORT_KEYS = {
+    "rating": ("rating", True),
+    "quickest": ("total_time", False),
+    "prep_time": ("prep_time", False),
+    "cook_time": ("cook_time", False),
+    "portion": ("portion", True),
+    "kcal": ("kcal", False),
+}
+
+NUMERIC_COLUMNS = ("rating", "prep_time", "cook_time", "total_time", "portion", "kcal")
+
+
+class RecipeCard:
+    """Display fields for one recipe card; supports card['name'] like a Row."""
+
+    __slots__ = ("id", "name", "poster", "cuisine", "portion", "cook_time", "prep_time", "rating", "version")
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, row[field])
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+def _number(value):
+    # Blank or non-numeric values (e.g. '' from a form) count as missing
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class RecipeCatalog:
+    """Columnar copy of the recipe catalog.
+
+    load_rows is the loader: a callable returning recipe rows (all recipes
+    when called with no ids, else just those ids). Changes made in this
+    process are applied with refresh(), all ids of a bulk action at once.
+    Changes made by other server workers are picked up every sync_interval
+    seconds: from the change log if load_changes is given, else by a full
+    reload.
+
+    load_changes(after_seq) returns (changed recipe ids, seq to resume from);
+    ids is None when the log can't tell (e.g. after_seq is None, or entries
+    were compacted away), and the catalog reloads instead.
+    """
+
+    def __init__(self, load_rows, sync_interval=30, load_changes=None):
+        self._load_rows = load_rows
+        self._load_changes = load_changes
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._seq = None
+        self._reset()
+
+    def _reset(self):
+        self._ids = array("q")
+        self._columns = {name: array("d") for name in NUMERIC_COLUMNS}
+        self._cuisines = array("H")     # index into self._cuisine_names
+        self._cuisine_names = []
+        self._cuisine_codes = {}
+        self._cards = []
+        self._positions = {}            # recipe id -> row position
+
+    # LOADING
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.sync_interval:
+            return
+        if self._loaded_at is None or self._load_changes is None:
+            self.reload()
+            return
+
+        recipe_ids, seq = self._load_changes(self._seq)
+        if recipe_ids is None:
+            self.reload()
+            return
+        with self._lock:
+            self._apply(recipe_ids)
+            self._seq = seq
+            self._loaded_at = time.monotonic()
+
+    def reload(self):
+        # Log position first: anything committed while loading is replayed
+        # on the next sync, which is harmless
+        seq = self._load_changes(None)[1] if self._load_changes else None
+        rows = self._load_rows()
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._append(row)
+            self._seq = seq
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, recipe_ids):
+        """Re-read recipes after they were created, changed or deleted (one query)."""
+        with self._lock:
+            if self._loaded_at is None:
+                return      # nothing loaded yet; the first query loads everything
+            self._apply(list(recipe_ids))
+
+    def _apply(self, recipe_ids):
+        if not recipe_ids:
+            return
+        found = set()
+        for row in self._load_rows(recipe_ids):
+            self._upsert(row)
+            found.add(row["id"])
+        for recipe_id in recipe_ids:
+            if recipe_id not in found:
+                self._remove(recipe_id)
+
+    def _cuisine_code(self, cuisine):
+        key = (cuisine or "").lower()
+        if key not in self._cuisine_codes:
+            self._cuisine_codes[key] = len(self._cuisine_names)
+            self._cuisine_names.append(key)
+        return self._cuisine_codes[key]
+
+    def _values(self, row):
+        prep, cook = _number(row["prep_time"]), _number(row["cook_time"])
+        return {
+            "rating": _number(row["rating"]),
+            "prep_time": prep,
+            "cook_time": cook,
+            "total_time": prep + cook,
+            "portion": _number(row["portion"]),
+            "kcal": _number(row["kcal"]),
+        }
+
+    def _append(self, row):
+        self._positions[row["id"]] = len(self._ids)
+        self._ids.append(row["id"])
+        for name, value in self._values(row).items():
+            self._columns[name].append(value)
+        self._cuisines.append(self._cuisine_code(row["cuisine"]))
+        self._cards.append(RecipeCard(row))
+
+    def _upsert(self, row):
+        pos = self._positions.get(row["id"])
+        if pos is None:
+            self._append(row)
+            return
+        for name, value in self._values(row).items():
+            self._columns[name][pos] = value
+        self._cuisines[pos] = self._cuisine_code(row["cuisine"])
+        self._cards[pos] = RecipeCard(row)
+
+    def _remove(self, recipe_id):
+        # Move the last row into the hole so removal is O(1)
+        pos = self._positions.pop(recipe_id, None)
+        if pos is None:
+            return
+        last = len(self._ids) - 1
+        if pos != last:
+            self._ids[pos] = self._ids[last]
+            for column in self._columns.values():
+                column[pos] = column[last]
+            self._cuisines[pos] = self._cuisines[last]
+            self._cards[pos] = self._cards[last]
+            self._positions[self._ids[pos]] = pos
+        self._ids.pop()
+        for column in self._columns.values():
+            column.pop()
+        self._cuisines.pop()
+        self._cards.pop()
+
+    # QUERIES
+    def mask(self, cuisine=None, min_rating=None, max_total_time=None):
+        """Positions of the recipes that pass every given filter."""
+        with self._lock:
+            self._ensure_loaded()
+            selected = range(len(self._ids))
+
+            if cuisine:
+                code = self._cuisine_codes.get(cuisine.lower())
+                if code is None:
+                    return []
+                cuisines = self._cuisines
+                selected = [i for i in selected if cuisines[i] == code]
+            if min_rating is not None:
+                ratings = self._columns["rating"]
+                selected = [i for i in selected if ratings[i] >= min_rating]
+            if max_total_time is not None:
+                times = self._columns["total_time"]
+                selected = [i for i in selected if times[i] <= max_total_time]
+            return list(selected)
+
+    def top_k(self, sort, k=10, include_missing=False, **filters):
+        """The k best recipe cards by a SORT_KEYS key, after optional filters.
+
+        Uses a bounded heap (O(n log k)) rather than sorting every row.
+        Recipes with no value for the key are left out, or with
+        include_missing placed after all the others (for sorting a listing).
+        """
+        column_name, largest_first = SORT_KEYS[sort]
+        with self._lock:
+            positions = self.mask(**filters)
+            column = self._columns[column_name]
+            valued = [i for i in positions if not math.isnan(column[i])]
+            pick = heapq.nlargest if largest_first else heapq.nsmallest
+            best = pick(k, valued, key=column.__getitem__)
+            if include_missing and len(best) < k:
+                missing = [i for i in positions if math.isnan(column[i])]
+                best += missing[:k - len(best)]
+            return [self._cards[i] for i in best]
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ids)
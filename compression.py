@@ -0,0 +1,155 @@
+import zlib
+
+from werkzeug.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:     # optional; gzip only without it
+    brotli = None
+
+__all__ = [
+    "CompressionMiddleware"
+]
+
+# RESPONSE COMPRESSION
+# WSGI middleware that gzips (or brotli-compresses, if the brotli package is
+# installed and the client accepts it) text responses, including streamed
+# ones. The first min_size bytes are held back to decide: smaller bodies go
+# out as they are. After that, output is flushed with the first chunk (so a
+# streamed page's <head> still arrives immediately) and then whenever
+# flush_size bytes of input have built up.
+
+COMPRESSIBLE_TYPES = {
+    "text/html", "text/css", "text/plain", "text/xml", "application/xml",
+    "application/atom+xml", "application/json", "application/x-ndjson",
+    "application/javascript", "text/javascript", "image/svg+xml",
+}
+
+
+class _Gzip:
+    encoding = "gzip"
+
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header
+
+    def compress(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class _Brotli:
+    encoding = "br"
+
+    def __init__(self, level):
+        self._b = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._b.process(data)
+
+    def flush(self):
+        return self._b.flush()
+
+    def finish(self):
+        return self._b.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_level=5, flush_size=16 * 1024):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+        self.flush_size = flush_size
+
+    def _compressor(self, accept_encoding):
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        if brotli is not None and "br" in accepted:
+            return _Brotli(self.brotli_level)
+        if "gzip" in accepted:
+            return _Gzip(self.gzip_level)
+        return None
+
+    def __call__(self, environ, start_response):
+        compressor = self._compressor(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if compressor is None or environ.get("REQUEST_METHOD") == "HEAD":
+            # Sent as is, but a shared cache must still know the response
+            # depends on Accept-Encoding
+            def add_vary(status, headers, exc_info=None):
+                checked = Headers(headers)
+                if self._compressible(status, checked):
+                    checked.add("Vary", "Accept-Encoding")
+                    headers = checked.to_wsgi_list()
+                return start_response(status, headers, exc_info)
+
+            return self.app(environ, add_vary)
+
+        started = []
+
+        def capture(status, headers, exc_info=None):
+            started[:] = [status, headers, exc_info]
+            return lambda data: None    # write() is not used by Flask
+
+        body = self.app(environ, capture)
+        return self._respond(body, started, compressor, start_response)
+
+    def _compressible(self, status, headers):
+        code = int(status.split(" ", 1)[0])
+        content_type = headers.get("Content-Type", "").split(";")[0].strip()
+        return (200 <= code < 300 and code not in (204, 206)
+                and content_type in COMPRESSIBLE_TYPES
+                and "Content-Encoding" not in headers)
+
+    def _respond(self, body, started, compressor, start_response):
+        chunks = iter(body)
+        try:
+            # Hold back up to min_size bytes (start_response may also be
+            # called lazily, on the first chunk)
+            held, held_size, ended = [], 0, True
+            for chunk in chunks:
+                held.append(chunk)
+                held_size += len(chunk)
+                if held_size >= self.min_size:
+                    ended = False
+                    break
+
+            status, header_list, exc_info = started
+            headers = Headers(header_list)
+            if not self._compressible(status, headers):
+                start_response(status, header_list, exc_info)
+                yield from held
+                yield from chunks
+                return
+
+            headers.add("Vary", "Accept-Encoding")
+            if ended:
+                # Too small to be worth it
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                yield b"".join(held)
+                return
+
+            headers["Content-Encoding"] = compressor.encoding
+            headers.pop("Content-Length", None)
+            etag = headers.get("ETag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            start_response(status, headers.to_wsgi_list(), exc_info)
+
+            yield compressor.compress(b"".join(held)) + compressor.flush()
+            pending = 0
+            for chunk in chunks:
+                out = compressor.compress(chunk)
+                pending += len(chunk)
+                if pending >= self.flush_size:
+                    out += compressor.flush()
+                    pending = 0
+                if out:
+                    yield out
+            yield compressor.finish()
+        finally:
+            if hasattr(body, "close"):
+                body.close()
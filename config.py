@@ -0,0 +1,87 @@
+import os
+
+__all__ = [
+    "Config",
+    "DevelopmentConfig",
+    "ProductionConfig",
+    "get_config"
+]
+
+
+# APP CONFIG
+# Pick one with the KITCHENHUB_ENV environment variable (development/production)
+class Config:
+    DEBUG = False
+    USE_RELOADER = False
+
+    # Server settings used by `python app.py` and serve.py
+    HOST = os.environ.get("KITCHENHUB_HOST", "0.0.0.0")
+    PORT = int(os.environ.get("KITCHENHUB_PORT", 81))
+    WORKERS = int(os.environ.get("KITCHENHUB_WORKERS", (os.cpu_count() or 1) * 2 + 1))
+    THREADS = int(os.environ.get("KITCHENHUB_THREADS", 4))
+    PRELOAD_APP = os.environ.get("KITCHENHUB_PRELOAD", "1") != "0"
+    # Seconds a worker gets to finish in-flight requests on reload/shutdown
+    GRACEFUL_TIMEOUT = int(os.environ.get("KITCHENHUB_GRACEFUL_TIMEOUT", 30))
+
+    # Serve catalog reads from an in-memory copy of the database (db.enable_read_snapshot)
+    READ_SNAPSHOT = os.environ.get("KITCHENHUB_READ_SNAPSHOT", "0") == "1"
+
+    # Store long recipe methods zlib-compressed (db.enable_method_compression)
+    COMPRESS_METHOD = os.environ.get("KITCHENHUB_COMPRESS_METHOD", "0") == "1"
+
+    # gzip (or brotli, if installed) responses of at least COMPRESS_MIN_SIZE
+    # bytes. Levels: gzip 1-9, brotli 0-11; higher is smaller but slower.
+    # Turn off when a reverse proxy already compresses.
+    COMPRESS_RESPONSES = os.environ.get("KITCHENHUB_COMPRESS", "1") != "0"
+    COMPRESS_MIN_SIZE = int(os.environ.get("KITCHENHUB_COMPRESS_MIN_SIZE", 1024))
+    GZIP_LEVEL = int(os.environ.get("KITCHENHUB_GZIP_LEVEL", 6))
+    BROTLI_LEVEL = int(os.environ.get("KITCHENHUB_BROTLI_LEVEL", 5))
+
+    # Seconds shared caches may keep the home, recipes and about pages for
+    # visitors without a session (0 = don't allow it)
+    PUBLIC_CACHE_SECONDS = int(os.environ.get("KITCHENHUB_PUBLIC_CACHE_SECONDS", 60))
+
+    # Replay the most requested pages when a worker starts (warmup.py), with
+    # this many requests at a time
+    WARMUP = os.environ.get("KITCHENHUB_WARMUP", "1") != "0"
+    WARMUP_CONCURRENCY = int(os.environ.get("KITCHENHUB_WARMUP_CONCURRENCY", 2))
+
+    # Background job threads per server process (0 = don't run jobs here)
+    JOB_THREADS = int(os.environ.get("KITCHENHUB_JOB_THREADS", 2))
+
+    # Throttle login/register/search (rate_limit.py). "memory" limits each
+    # server worker separately; "sqlite" shares the limits between workers.
+    RATE_LIMIT = os.environ.get("KITCHENHUB_RATE_LIMIT", "1") != "0"
+    RATE_LIMIT_STORE = os.environ.get("KITCHENHUB_RATE_LIMIT_STORE", "memory")
+    # Limits are per client address. Behind reverse proxies, set this to how
+    # many of them sit in front of the app: the client address (and scheme
+    # and host) is then taken from that many X-Forwarded-* hops. Leave it at
+    # 0 when clients connect directly, or anyone could pick their address.
+    TRUSTED_PROXIES = int(os.environ.get("KITCHENHUB_TRUSTED_PROXIES", 0))
+
+    # Online backups (backup.py): where snapshots go and how many to keep per database
+    BACKUP_DIR = os.environ.get("KITCHENHUB_BACKUP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "backups"))
+    BACKUP_KEEP = int(os.environ.get("KITCHENHUB_BACKUP_KEEP", 7))
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    USE_RELOADER = True
+
+
+class ProductionConfig(Config):
+    pass
+
+
+_CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    name = name or os.environ.get("KITCHENHUB_ENV", "development")
+    try:
+        return _CONFIGS[name]
+    except KeyError:
+        raise ValueError(f"Unknown config '{name}', expected one of: {', '.join(_CONFIGS)}")
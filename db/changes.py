@@ -0,0 +1,101 @@
+import time
+
+__all__ = [
+    "CHANGE_TABLES",
+    "create_change_log",
+    "latest_seq",
+    "read_changes",
+    "get_offset",
+    "save_offset",
+    "compact"
+]
+
+# CHANGE LOG
+# Triggers append one row to `changes` for every insert, update and delete
+# on the catalog tables, whichever code path made it. seq only ever grows
+# (AUTOINCREMENT never reuses a number, even after compaction), so a
+# consumer can remember the last seq it applied and later read just the
+# rows after it.
+
+# table -> (row id, recipe id) expressions, with {row} standing for NEW/OLD
+CHANGE_TABLES = {
+    "recipes": ("{row}.id", "{row}.id"),
+    "ingredients": ("{row}.id", "NULL"),
+    "recipe_ingredients": ("{row}.ingredient_id", "{row}.recipe_id"),
+}
+
+
+def create_change_log(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            op TEXT NOT NULL,
+            row_id INTEGER,
+            recipe_id INTEGER,
+            -- Unix time; unixepoch('subsec') needs SQLite 3.42
+            changed_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_changes_changed_at ON changes (changed_at)")
+    # Saved read positions of durable consumers
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_offsets (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )""")
+
+    for table, (row_id, recipe_id) in CHANGE_TABLES.items():
+        for op, event, row in (("insert", "INSERT", "NEW"), ("update", "UPDATE", "NEW"), ("delete", "DELETE", "OLD")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS changes_{table}_{op} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO changes (tbl, op, row_id, recipe_id)
+                    VALUES ('{table}', '{op}', {row_id.format(row=row)}, {recipe_id.format(row=row)});
+                END""")
+
+
+def latest_seq(conn):
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+
+def read_changes(conn, after_seq, limit=1000):
+    """Up to `limit` changes after after_seq, oldest first, and whether some
+    were compacted away before the consumer read them (then it must rebuild)."""
+    oldest = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+    missed = oldest is not None and oldest > after_seq + 1
+    rows = conn.execute(
+        "SELECT * FROM changes WHERE seq > ? ORDER BY seq LIMIT ?", (after_seq, limit)
+    ).fetchall()
+    return rows, missed
+
+
+def get_offset(conn, consumer):
+    """Last seq the consumer applied, or None if it never ran."""
+    row = conn.execute("SELECT seq FROM change_offsets WHERE consumer = ?", (consumer,)).fetchone()
+    return row[0] if row else None
+
+
+def save_offset(conn, consumer, seq):
+    conn.execute(
+        """INSERT INTO change_offsets (consumer, seq) VALUES (?, ?)
+        ON CONFLICT (consumer) DO UPDATE SET seq = MAX(seq, excluded.seq)""",
+        (consumer, seq)
+    )
+
+
+def compact(conn, min_age, max_age):
+    """Drop changes every durable consumer has applied once they are min_age
+    seconds old (in-process consumers such as the catalog read without saving
+    an offset), and any change older than max_age, applied or not; a consumer
+    that far behind rebuilds. Caller commits.
+
+    The newest row is always kept, so seq and the missed-changes check carry on.
+    """
+    now = time.time()
+    return conn.execute("""
+        DELETE FROM changes
+        WHERE seq < (SELECT MAX(seq) FROM changes)
+          AND (changed_at < ?
+               OR (changed_at < ? AND seq <= (SELECT COALESCE(MIN(seq), 0) FROM change_offsets)))""",
+        (now - max_age, now - min_age)
+    ).rowcount
@@ -1,8 +1,22 @@
 import sqlite3
 import os
+import json
+import math
+import threading
+import time
+import zlib
 from flask import abort
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from db.jobs import enqueue, job_handler
+from db.search import create_search_tables, index_recipe, rebuild_search_index, fuzzy_search
+from db.changes import create_change_log, latest_seq, read_changes, get_offset, save_offset, compact
+from db.leaderboard import (
+    LEADERBOARDS, LEADERBOARD_SIZE, create_leaderboard_tables, rebuild_leaderboards,
+    update_leaderboards, leaderboard_entries
+)
+from db.stats import create_stats_tables, ViewCounter
+
 __all__ = [
     "create_user",
     "validate_login",
@@ -10,24 +24,407 @@ __all__ = [
     "get_user_by_id",
     "get_all_recipes",
     "get_recipe_by_id",
+    "get_recipes_page",
+    "iter_recipes",
+    "iter_sitemap_rows",
+    "get_max_recipe_id",
+    "get_recent_recipes",
+    "get_catalog_rows",
+    "get_leaderboard",
+    "record_upload",
+    "get_upload",
+    "record_view",
+    "flush_views",
+    "get_most_viewed",
+    "get_recipe_stats",
+    "get_changes",
+    "get_changed_recipe_ids",
+    "tail_changes",
+    "LEADERBOARDS",
+    "on_recipe_change",
+    "migrate",
+    "init_db_worker",
+    "enable_read_snapshot",
+    "enable_method_compression",
     "create_recipe",
     "update_recipe",
     "delete_recipe",
+    "bulk_delete_recipes",
+    "bulk_update_recipes",
     "get_recipe_ingredients",
     "get_all_ingredients",
     "update_recipe_ingredients",
-    "delete_recipe_ingredients"
+    "delete_recipe_ingredients",
+    "search_recipes",
+    "fuzzy_search_recipes",
+    "recompute_nutrition",
+    "reindex_recipe",
+    "sync_search_index",
+    "compact_change_log",
+    "compress_existing_methods"
 ]
 
 # DB CONNECTION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "database.db")
+
+# Bumped whenever _upgrade_schema learns a new step; stored in PRAGMA user_version
+SCHEMA_VERSION = 8
+
+_schema_checked = False
+
 def get_db_connection():
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    DB_PATH = os.path.join(BASE_DIR, "database.db")
+    global _schema_checked
     conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    _prepare_connection(conn)
+    if not _schema_checked:
+        # One pragma read when the database was migrated already (see migrate())
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _upgrade_schema(conn)
+        _schema_checked = True
+    # Enforce foreign keys (and ON DELETE CASCADE) on every connection.
+    # Has to come after the schema upgrade, which rebuilds tables.
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _upgrade_schema(conn):
+    # Columns added after the original recipes table was created.
+    # BEGIN IMMEDIATE takes the write lock first so two workers starting at
+    # once can't both try to add the same column.
+    conn.execute("BEGIN IMMEDIATE")
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(recipes)")}
+    if columns and "version" not in columns:
+        conn.execute("ALTER TABLE recipes ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    if columns and "kcal" not in columns:
+        # Filled in by the recompute_nutrition background job
+        conn.execute("ALTER TABLE recipes ADD COLUMN kcal FLOAT")
+    if columns and "updated_at" not in columns:
+        # Unix times for the sitemap and feed; recipes from before are dated now
+        conn.execute("ALTER TABLE recipes ADD COLUMN created_at REAL")
+        conn.execute("ALTER TABLE recipes ADD COLUMN updated_at REAL")
+        now = time.time()
+        conn.execute("UPDATE recipes SET created_at = ?, updated_at = ?", (now, now))
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_recipes_updated_at ON recipes (updated_at)")
+
+    # recipe_ingredients was created without ON DELETE CASCADE. SQLite can't
+    # alter a foreign key, so rebuild the table once with the cascade added.
+    fks = conn.execute("PRAGMA foreign_key_list(recipe_ingredients)").fetchall()
+    if fks and any(fk["on_delete"] != "CASCADE" for fk in fks):
+        # Separate execute() calls, not executescript(), which would commit
+        # and give up the write lock taken above
+        conn.execute("""
+            CREATE TABLE recipe_ingredients_new (
+                recipe_id INTEGER NOT NULL,
+                ingredient_id INTEGER NOT NULL,
+                PRIMARY KEY (recipe_id, ingredient_id),
+                FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE,
+                FOREIGN KEY (ingredient_id) REFERENCES ingredients(id) ON DELETE CASCADE
+            )""")
+        conn.execute("""
+            INSERT INTO recipe_ingredients_new (recipe_id, ingredient_id)
+            SELECT recipe_id, ingredient_id FROM recipe_ingredients""")
+        conn.execute("DROP TABLE recipe_ingredients")
+        conn.execute("ALTER TABLE recipe_ingredients_new RENAME TO recipe_ingredients")
+
+    # Trigram search index, built from scratch the first time
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_words'"
+    ).fetchone()
+    if columns and not has_index:
+        create_search_tables(conn)
+        rebuild_search_index(conn)
+
+    # Leaderboards, filled from scratch the first time
+    has_leaderboard = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leaderboard'"
+    ).fetchone()
+    if columns and not has_leaderboard:
+        create_leaderboard_tables(conn)
+        rebuild_leaderboards(conn)
+
+    # One row per stored poster image (uploads.py); recipes.poster holds its url
+    if columns:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                sha256 TEXT PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                mime TEXT NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )""")
+
+    # Change log filled by triggers (db/changes.py). The search index is
+    # current at this point, so its consumer starts from the end of the log.
+    if columns:
+        create_change_log(conn)
+        if get_offset(conn, "search") is None:
+            save_offset(conn, "search", latest_seq(conn))
+
+    # View counts, written behind by db/stats.py
+    if columns:
+        create_stats_tables(conn)
+
+    # Counts writes to the snapshot tables, so other commits (jobs, view
+    # counts) don't rebuild the read snapshot
+    if columns:
+        _create_snapshot_version(conn)
+
+    # Blank times and ratings were once stored as text, which SQLite sorts
+    # as 0, so they topped the leaderboards
+    if columns:
+        cleared = 0
+        for column in ("prep_time", "cook_time", "rating"):
+            cleared += conn.execute(
+                f"UPDATE recipes SET {column} = NULL WHERE typeof({column}) = 'text'"
+            ).rowcount
+        if cleared:
+            rebuild_leaderboards(conn)
+    if columns:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+
+def migrate():
+    """Bring the schema up to date. Run once per deploy (`flask --app app migrate`,
+    or by serve.py before it forks), so workers start without checking tables."""
+    global _schema_checked
+    conn = sqlite3.connect(DB_PATH)
+    _prepare_connection(conn)
+    _upgrade_schema(conn)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    _schema_checked = True
+    return version
+
+
+def init_db_worker():
+    """Set up SQLite for a freshly forked server worker.
+
+    Nothing opened by the parent process is reused; the worker opens its own
+    connection, re-checks the schema and makes sure WAL mode is on so readers
+    in other workers don't block on a writer.
+    """
+    global _schema_checked, _snapshot_uri, _snapshot_anchor, _snapshot_watch
+    _schema_checked = False
+    _snapshot_uri = _snapshot_anchor = _snapshot_watch = None
+
+    conn = get_db_connection()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+
+    if _snapshot_enabled:
+        _snapshot_connection().close()
+
+
+# READ SNAPSHOT
+# Optional: serve catalog reads from an in-memory copy of the catalog tables.
+# The copy is made with the SQLite backup API and swapped for a fresh one
+# when a commit from any connection or process (PRAGMA data_version) wrote
+# to one of SNAPSHOT_TABLES, which triggers count in `snapshot_version`.
+SNAPSHOT_TABLES = (
+    "recipes", "ingredients", "recipe_ingredients", "search_words", "search_trigrams", "leaderboard", "uploads"
+)
+
+_snapshot_lock = threading.Lock()
+_snapshot_enabled = False
+_snapshot_uri = None          # shared-cache URI of the current copy
+_snapshot_anchor = None       # keeps the current in-memory database alive
+_snapshot_watch = None        # disk connection used only to read data_version
+_snapshot_data_version = None
+_snapshot_table_version = None
+_snapshot_generation = 0
+
+
+def _create_snapshot_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot_version (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        )""")
+    conn.execute("INSERT OR IGNORE INTO snapshot_version (id, version) VALUES (0, 0)")
+    for table in SNAPSHOT_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS snapshot_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE snapshot_version SET version = version + 1;
+                END""")
+
+def enable_read_snapshot():
+    global _snapshot_enabled
+    _snapshot_enabled = True
+
+
+def _build_snapshot():
+    global _snapshot_generation
+    _snapshot_generation += 1
+    uri = f"file:kitchenhub_snapshot_{os.getpid()}_{_snapshot_generation}?mode=memory&cache=shared"
+
+    anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    source = get_db_connection()
+    source.backup(anchor)
+    source.close()
+
+    # Only the catalog is served from memory; drop users etc. from the copy
+    tables = anchor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    for (name,) in tables:
+        if name not in SNAPSHOT_TABLES:
+            anchor.execute(f'DROP TABLE "{name}"')
+    anchor.commit()
+    return uri, anchor
+
+
+def _snapshot_connection():
+    """A new connection to the current snapshot, rebuilt first if it's stale."""
+    global _snapshot_uri, _snapshot_anchor, _snapshot_watch, _snapshot_data_version, _snapshot_table_version
+    with _snapshot_lock:
+        if _snapshot_watch is None:
+            # Run any pending schema upgrade first so it doesn't trigger a rebuild
+            get_db_connection().close()
+            _snapshot_watch = sqlite3.connect(DB_PATH, check_same_thread=False)
+        data_version = _snapshot_watch.execute("PRAGMA data_version").fetchone()[0]
+
+        if _snapshot_uri is None or data_version != _snapshot_data_version:
+            # Something committed; only rebuild if it touched the snapshot tables
+            table_version = _snapshot_watch.execute("SELECT version FROM snapshot_version").fetchone()[0]
+            _snapshot_data_version = data_version
+            if _snapshot_uri is None or table_version != _snapshot_table_version:
+                uri, anchor = _build_snapshot()
+                old_anchor = _snapshot_anchor
+                _snapshot_uri, _snapshot_anchor, _snapshot_table_version = uri, anchor, table_version
+                # Readers still using the old copy keep it alive until they close
+                if old_anchor is not None:
+                    old_anchor.close()
+
+        # Connect before releasing the lock: once a swap closes the anchor, the
+        # old copy only lives on while some connection has it open
+        return sqlite3.connect(_snapshot_uri, uri=True)
+
+
+def get_read_connection():
+    """Connection for catalog reads: the in-memory snapshot if enabled, else disk."""
+    if not _snapshot_enabled:
+        return get_db_connection()
+    conn = _snapshot_connection()
+    _prepare_connection(conn)
     return conn
 
 
+def _prepare_connection(conn):
+    conn.row_factory = sqlite3.Row
+    conn.create_function("pack_text", 1, _pack_text, deterministic=True)
+    conn.create_function("unpack_text", 1, _unpack_text, deterministic=True)
+
+
+# METHOD COMPRESSION
+# Optional: store long `method` text zlib-compressed as a BLOB, which shrinks
+# the database and lets more of it fit in the page cache. Plain TEXT and
+# compressed BLOB values can sit side by side; reads go through unpack_text().
+COMPRESS_MIN_BYTES = 256
+_compress_method = False
+
+def enable_method_compression():
+    global _compress_method
+    _compress_method = True
+    # Existing rows are converted in the background, once
+    enqueue("recipes.compress_methods", dedupe_key="compress_methods")
+
+
+def _pack_text(value):
+    if not _compress_method or not isinstance(value, str):
+        return value
+    data = value.encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return value
+    return zlib.compress(data, 9)
+
+
+def _unpack_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+# CHANGE LISTENERS
+# Callbacks run with a list of recipe ids after recipes are created, updated
+# or deleted, e.g. to drop cached HTML fragments for them. A bulk action
+# calls each callback once with all of its ids.
+_recipe_change_listeners = []
+
+def on_recipe_change(callback):
+    _recipe_change_listeners.append(callback)
+    return callback
+
+
+def _notify_recipe_change(recipe_ids):
+    for callback in _recipe_change_listeners:
+        callback(recipe_ids)
+
+
+# CHANGE LOG
+# Every write to recipes, ingredients and recipe_ingredients is appended to
+# the `changes` table by triggers (db/changes.py). Consumers read it from the
+# last seq they applied instead of rebuilding from scratch.
+CHANGE_MIN_AGE = 3600                 # seconds kept after every durable consumer applied a change
+CHANGE_MAX_AGE = 7 * 24 * 3600        # seconds kept at most
+CHANGE_COMPACT_INTERVAL = 3600
+
+def get_changes(after_seq=0, limit=1000):
+    """(changes after after_seq oldest first, missed) - missed means some were
+    already compacted away, so the caller has to rebuild instead."""
+    conn = get_db_connection()
+    rows, missed = read_changes(conn, after_seq, limit)
+    conn.close()
+    return rows, missed
+
+
+def get_changed_recipe_ids(after_seq, limit=1000):
+    """Ids of recipes whose own row changed after after_seq, and the seq to
+    resume from. Ids is None when the log can't tell: after_seq is None,
+    changes were missed, or there are more than limit of them."""
+    conn = get_db_connection()
+    if after_seq is None:
+        seq = latest_seq(conn)
+        conn.close()
+        return None, seq
+
+    rows, missed = read_changes(conn, after_seq, limit)
+    conn.close()
+    if missed or len(rows) == limit:
+        return None, after_seq
+    recipe_ids = list(dict.fromkeys(row["row_id"] for row in rows if row["tbl"] == "recipes"))
+    return recipe_ids, (rows[-1]["seq"] if rows else after_seq)
+
+
+def tail_changes(consumer, apply, rebuild, limit=1000):
+    """Apply the next batch of changes for a durable consumer.
+
+    apply(conn, rows) handles the changes after the consumer's saved offset;
+    rebuild(conn) starts over when it never ran or missed changes. Either
+    runs in the same transaction as the new offset, so a batch is applied
+    exactly once. Returns how many changes were applied (0 after a rebuild).
+    """
+    conn = get_db_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        offset = get_offset(conn, consumer)
+        rows, missed = read_changes(conn, offset or 0, limit)
+        if offset is None or missed:
+            rebuild(conn)
+            save_offset(conn, consumer, latest_seq(conn))
+            rows = []
+        elif rows:
+            apply(conn, rows)
+            save_offset(conn, consumer, rows[-1]["seq"])
+    conn.close()
+    return len(rows)
+
+
 # USERS
 def create_user(username, password):
     hashed = generate_password_hash(password)
@@ -58,9 +455,15 @@ def get_user_by_id(user_id):
 
 
 # RECIPES
+# Columns a recipe card shows. List and search pages select only these, so
+# the long method and review text is only read on the detail page.
+CARD_COLUMNS = "id, name, poster, portion, cook_time, prep_time, cuisine, rating, version"
+DETAIL_COLUMNS = f"{CARD_COLUMNS}, unpack_text(method) AS method, review, kcal"
+
+
 def get_all_recipes(limit=None, order_by="name ASC"):
-    conn = get_db_connection()
-    query = f"SELECT * FROM recipes ORDER BY {order_by}"
+    conn = get_read_connection()
+    query = f"SELECT {CARD_COLUMNS} FROM recipes ORDER BY {order_by}"
 
     if limit:
         query += f" LIMIT {limit}"
@@ -70,9 +473,141 @@ def get_all_recipes(limit=None, order_by="name ASC"):
     return recipes
 
 
+# Columns the JSON API is allowed to project; anything else is rejected
+RECIPE_FIELDS = (
+    "id", "name", "method", "cook_time", "prep_time",
+    "portion", "poster", "cuisine", "rating", "review", "kcal"
+)
+
+
+def _recipe_filter_sql(after_id, cuisine, min_rating):
+    clauses = ["id > ?"]
+    params = [after_id]
+
+    if cuisine:
+        clauses.append("LOWER(cuisine) = ?")
+        params.append(cuisine.lower())
+
+    if min_rating is not None:
+        clauses.append("rating >= ?")
+        params.append(min_rating)
+
+    return " AND ".join(clauses), params
+
+
+def _recipe_columns(fields):
+    # id is always selected because it is the pagination cursor
+    fields = [f for f in (fields or RECIPE_FIELDS) if f in RECIPE_FIELDS]
+    if "id" not in fields:
+        fields.insert(0, "id")
+    return ", ".join("unpack_text(method) AS method" if f == "method" else f for f in fields)
+
+
+def get_recipes_page(fields=None, after_id=0, limit=20, cuisine=None, min_rating=None):
+    """Return one keyset-paginated page of recipes ordered by id.
+
+    Fetches limit + 1 rows so the caller can tell whether another page follows
+    without a separate COUNT query. Returns (rows, next_cursor).
+    """
+    where, params = _recipe_filter_sql(after_id, cuisine, min_rating)
+    sql = f"SELECT {_recipe_columns(fields)} FROM recipes WHERE {where} ORDER BY id LIMIT ?"
+
+    conn = get_read_connection()
+    rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
+
+
+def iter_recipes(fields=None, cuisine=None, min_rating=None, batch_size=100):
+    """Yield every matching recipe row without loading the catalog into memory."""
+    where, params = _recipe_filter_sql(0, cuisine, min_rating)
+    sql = f"SELECT {_recipe_columns(fields)} FROM recipes WHERE {where} ORDER BY id"
+
+    conn = get_read_connection()
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def iter_sitemap_rows(first_id, end_id, batch_size=1000):
+    """Yield (id, updated_at) for first_id <= id < end_id in id order, for sitemap.py."""
+    conn = get_read_connection()
+    try:
+        cursor = conn.execute(
+            "SELECT id, updated_at FROM recipes WHERE id >= ? AND id < ? ORDER BY id",
+            (first_id, end_id)
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def get_max_recipe_id():
+    conn = get_read_connection()
+    max_id = conn.execute("SELECT MAX(id) FROM recipes").fetchone()[0]
+    conn.close()
+    return max_id
+
+
+def get_recent_recipes(limit=50):
+    """Most recently added or updated recipes, newest first (the Atom feed)."""
+    conn = get_read_connection()
+    rows = conn.execute(
+        f"SELECT {CARD_COLUMNS}, created_at, updated_at FROM recipes ORDER BY updated_at DESC, id DESC LIMIT ?",
+        (limit,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def get_catalog_rows(recipe_ids=None):
+    """Card columns plus kcal, for the in-process catalog (catalog.py)."""
+    sql = f"SELECT {CARD_COLUMNS}, kcal FROM recipes"
+    params = ()
+    if recipe_ids is not None:
+        sql += " WHERE id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(recipe_ids)),)
+
+    conn = get_read_connection()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def get_leaderboard(board, cuisine=None, limit=LEADERBOARD_SIZE):
+    """Card rows for a board in LEADERBOARDS, best first (db/leaderboard.py)."""
+    conn = get_read_connection()
+    scores = dict(leaderboard_entries(conn, board, cuisine, limit))
+    rows = conn.execute(
+        f"SELECT {CARD_COLUMNS} FROM recipes WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(scores)),)
+    ).fetchall()
+    conn.close()
+
+    # Each with the score it is ranked by, e.g. total minutes for "quickest"
+    position = {recipe_id: i for i, recipe_id in enumerate(scores)}
+    rows.sort(key=lambda row: position[row["id"]])
+    return [dict(row, score=scores[row["id"]]) for row in rows]
+
+
 def get_recipe_by_id(recipe_id):
-    conn = get_db_connection()
-    recipe = conn.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+    conn = get_read_connection()
+    recipe = conn.execute(f"SELECT {DETAIL_COLUMNS} FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
     conn.close()
 
     if not recipe:
@@ -82,43 +617,166 @@ def get_recipe_by_id(recipe_id):
     return recipe, ingredients, ingredient_ids
 
 
+def _minutes(value):
+    """A time from a form as a number, or None if blank or not a number.
+    Stored as given, SQLite would keep '' as text."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
 def create_recipe(name, method, cook_time, prep_time, portion, poster, cuisine, rating, review):
+    now = time.time()
     conn = get_db_connection()
-    conn.execute(
+    cursor = conn.execute(
         """INSERT INTO recipes
-        (name, method, cook_time, prep_time, portion, poster, cuisine, rating, review)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        (name, method, cook_time, prep_time, portion, poster, cuisine, rating, review, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (name, method, cook_time, prep_time, portion, poster, cuisine, rating, review)
+        (name, _pack_text(method), _minutes(cook_time), _minutes(prep_time), portion, poster, cuisine, rating, review,
+         now, now)
     )
+    recipe_id = cursor.lastrowid
+    update_leaderboards(conn, recipe_id)
     conn.commit()
     conn.close()
+    _notify_recipe_change([recipe_id])
+    _enqueue_recipe_jobs(recipe_id)
+    return recipe_id
 
 def update_recipe(recipe_id, name, prep_time, cook_time, cuisine, rating, review):
     conn = get_db_connection()
+    old = conn.execute("SELECT cuisine FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
     conn.execute(
         """
         UPDATE recipes
-        SET name = ?, prep_time = ?, cook_time = ?, cuisine = ?, rating = ?, review = ?
+        SET name = ?, prep_time = ?, cook_time = ?, cuisine = ?, rating = ?, review = ?,
+            version = version + 1, updated_at = ?
         WHERE id = ?
         """,
-        (name, prep_time, cook_time, cuisine, rating, review, recipe_id)
+        (name, _minutes(prep_time), _minutes(cook_time), cuisine, rating, review, time.time(), recipe_id)
     )
+    update_leaderboards(conn, recipe_id, old["cuisine"] if old else None)
     conn.commit()
     conn.close()
+    _notify_recipe_change([recipe_id])
+    _enqueue_recipe_jobs(recipe_id)
 
 
 def delete_recipe(recipe_id):
+    # recipe_ingredients rows go with it (ON DELETE CASCADE)
     conn = get_db_connection()
+    old = conn.execute("SELECT cuisine FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
     conn.execute("DELETE FROM recipes WHERE id=?", (recipe_id,))
+    update_leaderboards(conn, recipe_id, old["cuisine"] if old else None)
+    conn.commit()
+    conn.close()
+    _notify_recipe_change([recipe_id])
+
+
+# UPLOADS
+def record_upload(upload):
+    """Save the metadata of a stored image (dict from uploads.store_image).
+    Content-addressed, so a duplicate image is already recorded."""
+    conn = get_db_connection()
+    conn.execute(
+        """INSERT OR IGNORE INTO uploads (sha256, url, mime, width, height, size)
+        VALUES (:sha256, :url, :mime, :width, :height, :size)""",
+        upload
+    )
     conn.commit()
     conn.close()
 
 
+def get_upload(url):
+    conn = get_read_connection()
+    upload = conn.execute("SELECT * FROM uploads WHERE url = ?", (url,)).fetchone()
+    conn.close()
+    return upload
+
+
+# VIEW STATS
+# Counted in memory and flushed in batches (db/stats.py); the analytics
+# queries read the flushed totals from the database, not the snapshot
+_view_counter = ViewCounter(get_db_connection)
+
+
+def record_view(recipe_id):
+    _view_counter.record(recipe_id)
+
+
+def flush_views():
+    return _view_counter.flush()
+
+
+def get_most_viewed(limit=10):
+    conn = get_db_connection()
+    rows = conn.execute(f"""
+        SELECT {CARD_COLUMNS}, views, last_viewed_at
+        FROM recipe_stats JOIN recipes ON recipes.id = recipe_stats.recipe_id
+        ORDER BY recipe_stats.views DESC, recipe_stats.recipe_id
+        LIMIT ?""", (limit,)).fetchall()
+    conn.close()
+    return rows
+
+
+def get_recipe_stats(recipe_id):
+    """Flushed view totals for one recipe; views since the last flush aren't in yet."""
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT views, last_viewed_at FROM recipe_stats WHERE recipe_id = ?", (recipe_id,)
+    ).fetchone()
+    conn.close()
+    return row
+
+
+# BULK ADMIN OPERATIONS
+# Each runs as one set-based statement in one transaction, however many ids.
+# The ids are passed as a single JSON array parameter and expanded with
+# json_each, so there is no limit on the number of SQL variables.
+def bulk_delete_recipes(recipe_ids):
+    recipe_ids = [int(i) for i in recipe_ids]
+    conn = get_db_connection()
+    with conn:
+        deleted = conn.execute(
+            "DELETE FROM recipes WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(recipe_ids),)
+        ).rowcount
+        # One pass over all boards beats patching them once per id
+        rebuild_leaderboards(conn)
+    conn.close()
+
+    _notify_recipe_change(recipe_ids)
+    return deleted
+
+
+def bulk_update_recipes(recipe_ids, cuisine=None, rating=None):
+    """Set cuisine and/or rating on many recipes; None leaves a field unchanged."""
+    recipe_ids = [int(i) for i in recipe_ids]
+    conn = get_db_connection()
+    with conn:
+        updated = conn.execute(
+            """
+            UPDATE recipes
+            SET cuisine = COALESCE(?, cuisine), rating = COALESCE(?, rating),
+                version = version + 1, updated_at = ?
+            WHERE id IN (SELECT value FROM json_each(?))
+            """,
+            (cuisine, rating, time.time(), json.dumps(recipe_ids))
+        ).rowcount
+        rebuild_leaderboards(conn)
+    conn.close()
+
+    _notify_recipe_change(recipe_ids)
+    return updated
+
+
 
 # INGREDIENTS
 def get_recipe_ingredients(recipe_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
 
     rows = conn.execute("""
         SELECT ingredients.* FROM ingredients
@@ -134,7 +792,7 @@ def get_recipe_ingredients(recipe_id):
 
 
 def get_all_ingredients():
-    conn = get_db_connection()
+    conn = get_read_connection()
     ingredients = conn.execute("SELECT * FROM ingredients").fetchall()
     conn.close()
     return ingredients
@@ -155,6 +813,7 @@ def update_recipe_ingredients(recipe_id, ingredients):
 
     conn.commit()
     conn.close()
+    _enqueue_recipe_jobs(recipe_id)
 
 
 def delete_recipe_ingredients(recipe_id):
@@ -163,19 +822,94 @@ def delete_recipe_ingredients(recipe_id):
     conn.commit()
     conn.close()
 
+def fuzzy_search_recipes(search_term):
+    """Typo-tolerant search over recipe and ingredient names (see db/search.py).
+
+    Returns (recipes best match first, "did you mean" suggestion or None).
+    """
+    conn = get_read_connection()
+    ranked, suggestion = fuzzy_search(conn, search_term)
+
+    ids = [recipe_id for recipe_id, score in ranked]
+    rows = conn.execute(
+        f"SELECT {CARD_COLUMNS} FROM recipes WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids),)
+    ).fetchall()
+    conn.close()
+
+    position = {recipe_id: i for i, recipe_id in enumerate(ids)}
+    rows.sort(key=lambda row: position[row["id"]])
+    return rows, suggestion
+
+
 def search_recipes(search_term):
+    return fuzzy_search_recipes(search_term)[0]
+
+
+# BACKGROUND JOBS
+# Work that doesn't need to finish before the response is queued in db/jobs.py.
+# Dedupe keys collapse repeated edits of one recipe into a single waiting job.
+def _enqueue_recipe_jobs(recipe_id):
+    enqueue("nutrition.recompute", {"recipe_id": recipe_id}, dedupe_key=f"nutrition:{recipe_id}")
+    # One waiting sync covers any number of writes; it reads them from the change log
+    enqueue("search.sync", dedupe_key="search:sync")
+    enqueue("changes.compact", dedupe_key="changes:compact", delay=CHANGE_COMPACT_INTERVAL)
+
+
+@job_handler("nutrition.recompute")
+def recompute_nutrition(recipe_id):
+    conn = get_db_connection()
+    conn.execute("""
+        UPDATE recipes SET kcal = (
+            SELECT SUM(ingredients.kcal) FROM ingredients
+            JOIN recipe_ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+            WHERE recipe_ingredients.recipe_id = recipes.id
+        )
+        WHERE id = ?""", (recipe_id,))
+    conn.commit()
+    conn.close()
+    _notify_recipe_change([recipe_id])
+
+
+@job_handler("search.reindex")
+def reindex_recipe(recipe_id):
     conn = get_db_connection()
-    cursor = conn.cursor()
+    with conn:
+        index_recipe(conn, recipe_id)
+    conn.close()
 
-    # Perform case-insensitive search
-    sql = """
-        SELECT id, name, poster
-        FROM recipes
-        WHERE LOWER(name) LIKE ?
-    """
-    # Allows partial matches
-    cursor.execute(sql, (f"%{search_term.lower()}%",))
-    results = cursor.fetchall()
 
+def _reindex_changed(conn, rows):
+    recipe_ids = {row["recipe_id"] for row in rows if row["recipe_id"] is not None}
+    # A renamed ingredient changes the words of every recipe that uses it
+    ingredient_ids = [row["row_id"] for row in rows if row["tbl"] == "ingredients"]
+    if ingredient_ids:
+        recipe_ids.update(r[0] for r in conn.execute(
+            "SELECT recipe_id FROM recipe_ingredients WHERE ingredient_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ingredient_ids),)
+        ))
+    for recipe_id in recipe_ids:
+        index_recipe(conn, recipe_id)
+
+
+@job_handler("search.sync")
+def sync_search_index():
+    """Re-index the recipes changed since the search index last caught up."""
+    while tail_changes("search", _reindex_changed, rebuild_search_index):
+        pass
+
+
+@job_handler("changes.compact")
+def compact_change_log():
+    conn = get_db_connection()
+    with conn:
+        compact(conn, CHANGE_MIN_AGE, CHANGE_MAX_AGE)
+    conn.close()
+
+
+@job_handler("recipes.compress_methods")
+def compress_existing_methods():
+    conn = get_db_connection()
+    with conn:
+        conn.execute("UPDATE recipes SET method = pack_text(method) WHERE typeof(method) = 'text'")
     conn.close()
-    return results
\ No newline at end of file
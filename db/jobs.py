@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+
+__all__ = [
+    "enqueue",
+    "job_handler",
+    "get_job_counts",
+    "get_recent_jobs",
+    "JobWorker",
+    "job_worker"
+]
+
+# BACKGROUND JOBS
+# A durable queue kept in the `jobs` table of database.db. Request handlers
+# enqueue work and return; JobWorker threads claim and run it off the request
+# path. Claiming is a single UPDATE, so several server workers can share
+# one queue.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "database.db")
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 2          # retry n waits BACKOFF_SECONDS * 2**(n-1)
+STALE_AFTER_SECONDS = 600    # running jobs older than this were orphaned by a dead worker
+DONE_RETENTION_SECONDS = 24 * 3600        # finished jobs are kept this long for the status page
+FAILED_RETENTION_SECONDS = 7 * 24 * 3600
+PRUNE_EVERY = 100            # finished jobs between prunes, per process
+
+_table_checked = False
+_handlers = {}
+_finished_since_prune = 0
+
+
+def _get_connection():
+    global _table_checked
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _table_checked:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                dedupe_key TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                run_at REAL NOT NULL,
+                locked_at REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs (status, run_at);
+            -- At most one waiting job per dedupe key
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe
+                ON jobs (dedupe_key) WHERE status = 'queued';
+        """)
+        _table_checked = True
+    return conn
+
+
+def job_handler(kind):
+    """Register the function that runs jobs of this kind: handler(**payload)."""
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, dedupe_key=None, delay=0, max_attempts=MAX_ATTEMPTS):
+    """Queue a job. If a job with the same dedupe_key is still waiting, this is a no-op."""
+    now = time.time()
+    conn = _get_connection()
+    conn.execute(
+        """INSERT OR IGNORE INTO jobs
+        (kind, payload, dedupe_key, max_attempts, run_at, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (kind, json.dumps(payload or {}), dedupe_key, max_attempts, now + delay, now, now)
+    )
+    conn.commit()
+    conn.close()
+    if job_worker is not None:
+        job_worker.wake()
+
+
+def _claim_job():
+    now = time.time()
+    conn = _get_connection()
+    job = conn.execute(
+        """
+        UPDATE jobs
+        SET status = 'running', attempts = attempts + 1, locked_at = ?, updated_at = ?
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE (status = 'queued' AND run_at <= ?)
+               OR (status = 'running' AND locked_at < ?)
+            ORDER BY run_at, id
+            LIMIT 1
+        )
+        RETURNING *
+        """,
+        (now, now, now, now - STALE_AFTER_SECONDS)
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return job
+
+
+def _finish_job(job, error=None):
+    global _finished_since_prune
+    now = time.time()
+    conn = _get_connection()
+    if error is None:
+        conn.execute(
+            "UPDATE jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE id = ?",
+            (now, job["id"])
+        )
+    elif job["attempts"] < job["max_attempts"]:
+        retry_at = now + BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+        # OR IGNORE: a newer job with the same dedupe key may already be waiting,
+        # in which case this one just stays failed
+        conn.execute(
+            """UPDATE OR IGNORE jobs
+            SET status = 'queued', run_at = ?, last_error = ?, updated_at = ?
+            WHERE id = ?""",
+            (retry_at, error, now, job["id"])
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+            (error, now, job["id"])
+        )
+    else:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE id = ?",
+            (error, now, job["id"])
+        )
+
+    # Every job run adds a row; drop old finished ones now and then so the
+    # table stays the size of the retention window
+    _finished_since_prune += 1
+    if _finished_since_prune >= PRUNE_EVERY:
+        _finished_since_prune = 0
+        _prune_jobs(conn, now)
+    conn.commit()
+    conn.close()
+
+
+def _prune_jobs(conn, now):
+    return conn.execute(
+        """DELETE FROM jobs
+        WHERE (status = 'done' AND updated_at < ?) OR (status = 'failed' AND updated_at < ?)""",
+        (now - DONE_RETENTION_SECONDS, now - FAILED_RETENTION_SECONDS)
+    ).rowcount
+
+
+def run_job(job):
+    handler = _handlers.get(job["kind"])
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job['kind']}'")
+        handler(**json.loads(job["payload"]))
+    except Exception:
+        _finish_job(job, traceback.format_exc(limit=5))
+    else:
+        _finish_job(job)
+
+
+def get_job_counts():
+    conn = _get_connection()
+    rows = conn.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status").fetchall()
+    conn.close()
+    return {row["status"]: row["total"] for row in rows}
+
+
+def get_recent_jobs(limit=50):
+    conn = _get_connection()
+    rows = conn.execute("SELECT * FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    return rows
+
+
+class JobWorker:
+    """Polls the jobs table from a small thread pool inside the web process."""
+
+    def __init__(self, threads=2, poll_interval=1.0):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._started_pid = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        # Keyed on pid: threads don't survive fork, so each server worker starts its own
+        if self._started_pid == os.getpid() or self.threads <= 0:
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._wake = threading.Event()
+            self._stop = threading.Event()
+            # Daemon threads so a half-finished job never blocks shutdown;
+            # it is picked up again once its lock goes stale
+            for n in range(self.threads):
+                threading.Thread(target=self._loop, name=f"job-{n}", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = _claim_job()
+            except sqlite3.OperationalError:
+                job = None    # database busy; try again next poll
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            run_job(job)
+
+
+job_worker = JobWorker()
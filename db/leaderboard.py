@@ -0,0 +1,120 @@
+__all__ = [
+    "LEADERBOARDS",
+    "LEADERBOARD_SIZE",
+    "create_leaderboard_tables",
+    "rebuild_leaderboards",
+    "update_leaderboards",
+    "leaderboard_entries"
+]
+
+# LEADERBOARDS
+# The best LEADERBOARD_SIZE recipes per board, for all cuisines (cuisine '')
+# and per cuisine, are kept in the `leaderboard` table. Reading a board is a
+# range scan of k index entries; writes to recipes patch only the boards the
+# changed recipe was or is now on (update_leaderboards), in the same
+# transaction as the write.
+
+LEADERBOARD_SIZE = 10
+
+
+def _numeric(column):
+    # NULL unless stored as a number: SQLite would read text such as '' as 0
+    return f"(CASE WHEN typeof({column}) IN ('integer', 'real') THEN {column} END)"
+
+
+# board -> score expression over recipes; lower scores rank first, and
+# recipes scoring NULL are left off the board
+LEADERBOARDS = {
+    "top_rated": f"-{_numeric('rating')}",
+    "quickest": f"{_numeric('prep_time')} + {_numeric('cook_time')}",
+}
+
+
+def create_leaderboard_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            board TEXT NOT NULL,
+            cuisine TEXT NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (board, cuisine, recipe_id)
+        ) WITHOUT ROWID""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard (board, cuisine, score, recipe_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_recipe ON leaderboard (recipe_id)")
+
+
+def _scopes(cuisine):
+    # Every recipe is on the all-cuisines boards and on its own cuisine's
+    return ["", cuisine.lower()] if cuisine else [""]
+
+
+def _fill(conn, board, cuisine, exclude_id=None):
+    """Top the board up to LEADERBOARD_SIZE from the recipes not on it yet."""
+    missing = LEADERBOARD_SIZE - conn.execute(
+        "SELECT COUNT(*) FROM leaderboard WHERE board = ? AND cuisine = ?", (board, cuisine)
+    ).fetchone()[0]
+    if missing <= 0:
+        return
+    score = LEADERBOARDS[board]
+    conn.execute(f"""
+        INSERT INTO leaderboard (board, cuisine, recipe_id, score)
+        SELECT ?, ?, id, {score} FROM recipes
+        WHERE {score} IS NOT NULL
+          AND (? = '' OR LOWER(cuisine) = ?)
+          AND id IS NOT ?
+          AND id NOT IN (SELECT recipe_id FROM leaderboard WHERE board = ? AND cuisine = ?)
+        ORDER BY {score}, id
+        LIMIT ?""", (board, cuisine, cuisine, cuisine, exclude_id, board, cuisine, missing))
+
+
+def _trim(conn, board, cuisine):
+    conn.execute("""
+        DELETE FROM leaderboard WHERE board = ? AND cuisine = ? AND recipe_id IN (
+            SELECT recipe_id FROM leaderboard WHERE board = ? AND cuisine = ?
+            ORDER BY score, recipe_id LIMIT -1 OFFSET ?
+        )""", (board, cuisine, board, cuisine, LEADERBOARD_SIZE))
+
+
+def rebuild_leaderboards(conn):
+    """Every board from scratch (caller commits)."""
+    conn.execute("DELETE FROM leaderboard")
+    cuisines = [row[0] for row in conn.execute(
+        "SELECT DISTINCT LOWER(cuisine) FROM recipes WHERE cuisine IS NOT NULL AND cuisine != ''"
+    )]
+    for board in LEADERBOARDS:
+        for cuisine in ["", *cuisines]:
+            _fill(conn, board, cuisine)
+
+
+def update_leaderboards(conn, recipe_id, old_cuisine=None):
+    """Patch the boards after one recipe was created, changed or deleted
+    (caller commits). old_cuisine is its cuisine before an update."""
+    row = conn.execute("SELECT cuisine FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+    new_scopes = _scopes(row[0]) if row else []
+
+    for board, score in LEADERBOARDS.items():
+        for cuisine in dict.fromkeys(_scopes(old_cuisine) + new_scopes):
+            was_on_board = conn.execute(
+                "DELETE FROM leaderboard WHERE board = ? AND cuisine = ? AND recipe_id = ?",
+                (board, cuisine, recipe_id)
+            ).rowcount
+            # Its place goes to the best recipe not on the board yet, before
+            # the recipe itself competes again with its new score
+            if was_on_board:
+                _fill(conn, board, cuisine, exclude_id=recipe_id)
+            if cuisine in new_scopes:
+                conn.execute(f"""
+                    INSERT INTO leaderboard (board, cuisine, recipe_id, score)
+                    SELECT ?, ?, id, {score} FROM recipes WHERE id = ? AND {score} IS NOT NULL""",
+                    (board, cuisine, recipe_id))
+                _trim(conn, board, cuisine)
+
+
+def leaderboard_entries(conn, board, cuisine=None, limit=LEADERBOARD_SIZE):
+    """(recipe id, score) pairs on a board, best first."""
+    rows = conn.execute("""
+        SELECT recipe_id, score FROM leaderboard
+        WHERE board = ? AND cuisine = ?
+        ORDER BY score, recipe_id
+        LIMIT ?""", (board, (cuisine or "").lower(), min(limit, LEADERBOARD_SIZE))).fetchall()
+    return [(row[0], row[1]) for row in rows]
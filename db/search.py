@@ -0,0 +1,165 @@
+import json
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+__all__ = [
+    "create_search_tables",
+    "index_recipe",
+    "rebuild_search_index",
+    "fuzzy_search"
+]
+
+# FUZZY SEARCH
+# Every word of a recipe's name and ingredient names is stored in search_words,
+# and each distinct word is broken into trigrams in search_trigrams. A query
+# word finds candidate words through shared trigrams (an index lookup, not a
+# scan), which are then re-ranked by edit similarity. That tolerates typos
+# like "spagetti" or "bolonese" and gives "did you mean" suggestions.
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+CANDIDATE_WORDS = 50     # trigram candidates re-ranked per query word
+MIN_JACCARD = 0.2        # trigram overlap needed to be a candidate at all
+MIN_SIMILARITY = 0.7     # edit similarity needed to count as a match
+MIN_RECIPE_SCORE = 0.5   # average match score a recipe needs across query words
+
+
+def create_search_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_words (
+            word TEXT NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            PRIMARY KEY (word, recipe_id),
+            FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE
+        ) WITHOUT ROWID""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_search_words_recipe ON search_words (recipe_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_trigrams (
+            trigram TEXT NOT NULL,
+            word TEXT NOT NULL,
+            PRIMARY KEY (trigram, word)
+        ) WITHOUT ROWID""")
+
+
+def words(text):
+    return WORD_RE.findall((text or "").lower())
+
+
+def trigrams(word):
+    # Padding makes word starts count more, like pg_trgm
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_recipe(conn, recipe_id):
+    """Re-index one recipe's name and ingredient names (caller commits)."""
+    conn.execute("DELETE FROM search_words WHERE recipe_id = ?", (recipe_id,))
+
+    recipe = conn.execute("SELECT name FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+    if recipe is None:
+        return
+
+    ingredients = conn.execute("""
+        SELECT ingredients.name FROM ingredients
+        JOIN recipe_ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+        WHERE recipe_ingredients.recipe_id = ?""", (recipe_id,)).fetchall()
+
+    recipe_words = set(words(recipe[0]))
+    for ingredient in ingredients:
+        recipe_words.update(words(ingredient[0]))
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO search_words (word, recipe_id) VALUES (?, ?)",
+        [(word, recipe_id) for word in recipe_words]
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO search_trigrams (trigram, word) VALUES (?, ?)",
+        [(gram, word) for word in recipe_words for gram in trigrams(word)]
+    )
+
+
+def rebuild_search_index(conn):
+    """Index every recipe from scratch (caller commits)."""
+    conn.execute("DELETE FROM search_words")
+    conn.execute("DELETE FROM search_trigrams")
+    for (recipe_id,) in conn.execute("SELECT id FROM recipes").fetchall():
+        index_recipe(conn, recipe_id)
+
+
+def _match_word(conn, word):
+    """Indexed words close to `word`, best first: [(word, score, kind), ...]
+    where kind is "exact", "substring" or "edit" (a likely typo)."""
+    grams = trigrams(word)
+    # Only words still used by a recipe; search_trigrams can keep words of
+    # deleted recipes until the next rebuild
+    candidates = conn.execute("""
+        SELECT t.word, COUNT(*) AS shared
+        FROM search_trigrams t
+        WHERE t.trigram IN (SELECT value FROM json_each(?))
+          AND EXISTS (SELECT 1 FROM search_words w WHERE w.word = t.word)
+        GROUP BY t.word
+        ORDER BY shared DESC
+        LIMIT ?""", (json.dumps(sorted(grams)), CANDIDATE_WORDS)).fetchall()
+
+    matches = []
+    for candidate, shared in candidates:
+        if candidate == word:
+            score, kind = 1.0, "exact"
+        elif word in candidate:
+            # Keeps the old substring behaviour: "pas" still finds "pasta"
+            score, kind = 0.9, "substring"
+        else:
+            kind = "edit"
+            jaccard = shared / (len(grams) + len(trigrams(candidate)) - shared)
+            if jaccard < MIN_JACCARD:
+                continue
+            score = SequenceMatcher(None, word, candidate).ratio()
+            if score < MIN_SIMILARITY:
+                continue
+        matches.append((candidate, score, kind))
+
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches
+
+
+def fuzzy_search(conn, query, limit=50):
+    """Rank recipes against a possibly misspelt query.
+
+    Returns ([(recipe_id, score), ...], suggestion) where suggestion is the
+    query with each word replaced by its best indexed match, or None when the
+    query already matches as typed.
+    """
+    query_words = words(query)
+    if not query_words:
+        return [], None
+
+    totals = defaultdict(float)
+    corrected = []
+    for word in query_words:
+        matches = _match_word(conn, word)
+        # Only suggest corrections for typos, not for exact or partial words
+        corrected.append(matches[0][0] if matches and matches[0][2] == "edit" else word)
+        if not matches:
+            continue
+
+        scores = {candidate: score for candidate, score, kind in matches}
+        best = {}
+        rows = conn.execute(
+            "SELECT word, recipe_id FROM search_words WHERE word IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(scores)),)
+        ).fetchall()
+        for matched_word, recipe_id in rows:
+            best[recipe_id] = max(best.get(recipe_id, 0), scores[matched_word])
+        for recipe_id, score in best.items():
+            totals[recipe_id] += score
+
+    ranked = [
+        (recipe_id, total / len(query_words))
+        for recipe_id, total in totals.items()
+        if total / len(query_words) >= MIN_RECIPE_SCORE
+    ]
+    ranked.sort(key=lambda r: r[1], reverse=True)
+
+    suggestion = " ".join(corrected)
+    return ranked[:limit], (suggestion if corrected != query_words else None)
@@ -0,0 +1,103 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+__all__ = [
+    "VIEW_FLUSH_INTERVAL",
+    "create_stats_tables",
+    "add_views",
+    "ViewCounter"
+]
+
+# RECIPE VIEW COUNTS
+# Views are counted in memory by each server process and written behind: a
+# flusher thread adds the counts to `recipe_stats` every VIEW_FLUSH_INTERVAL
+# seconds in one upsert, so showing a recipe never waits for the write lock.
+# A crashed process loses at most one interval of counts; serve.py flushes
+# the rest when a worker shuts down cleanly. last_viewed_at is the time of
+# the flush that carried the view.
+
+VIEW_FLUSH_INTERVAL = 10
+
+
+def create_stats_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS recipe_stats (
+            recipe_id INTEGER PRIMARY KEY REFERENCES recipes(id) ON DELETE CASCADE,
+            views INTEGER NOT NULL DEFAULT 0,
+            last_viewed_at REAL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recipe_stats_views ON recipe_stats (views DESC, recipe_id)")
+
+
+def add_views(conn, counts, viewed_at):
+    """Add {recipe id: views} to recipe_stats in one statement. Counts for
+    recipes deleted since they were viewed are dropped. Caller commits."""
+    conn.execute("""
+        INSERT INTO recipe_stats (recipe_id, views, last_viewed_at)
+        SELECT CAST(key AS INTEGER), value, ? FROM json_each(?)
+        WHERE CAST(key AS INTEGER) IN (SELECT id FROM recipes)
+        ON CONFLICT (recipe_id) DO UPDATE SET
+            views = views + excluded.views,
+            last_viewed_at = excluded.last_viewed_at""",
+        (viewed_at, json.dumps(counts))
+    )
+
+
+class ViewCounter:
+    """Per-process view counts, flushed to the database from a background thread."""
+
+    def __init__(self, connect, interval=VIEW_FLUSH_INTERVAL):
+        """connect() returns a new database connection for each flush."""
+        self.connect = connect
+        self.interval = interval
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._started_pid = None
+
+    def record(self, recipe_id):
+        if self._started_pid != os.getpid():
+            self._start()
+        with self._lock:
+            self._counts[recipe_id] = self._counts.get(recipe_id, 0) + 1
+
+    def _start(self):
+        # Keyed on pid like the job worker: each forked server worker runs its
+        # own flusher and starts from zero, not from the parent's counts
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            if self._started_pid is None:
+                atexit.register(self.flush)     # development server
+            self._counts = {}
+            threading.Thread(target=self._loop, name="view-flusher", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Write the counts gathered so far; returns how many views were flushed."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+        try:
+            conn = self.connect()
+            try:
+                with conn:
+                    add_views(conn, counts, time.time())
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            # Database busy or locked: keep the counts for the next flush
+            with self._lock:
+                for recipe_id, views in counts.items():
+                    self._counts[recipe_id] = self._counts.get(recipe_id, 0) + views
+            return 0
+        return sum(counts.values())
@@ -0,0 +1,76 @@
+import threading
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+__all__ = [
+    "FragmentCacheExtension",
+    "fragment_cache",
+    "invalidate_recipes"
+]
+
+
+class FragmentCache:
+    """Rendered HTML fragments keyed on (fragment name, recipe id).
+
+    Each entry remembers the recipe version it was rendered from, so a bumped
+    version simply overwrites the old fragment instead of piling up entries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fragments = {}
+
+    def get_or_render(self, name, recipe_id, version, render):
+        key = (name, recipe_id)
+        with self._lock:
+            cached = self._fragments.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        html = render()
+        with self._lock:
+            self._fragments[key] = (version, html)
+        return html
+
+    def invalidate(self, recipe_ids):
+        # One pass over the cache, however many recipes changed
+        recipe_ids = set(recipe_ids)
+        with self._lock:
+            for key in [k for k in self._fragments if k[1] in recipe_ids]:
+                del self._fragments[key]
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def invalidate_recipes(recipe_ids):
+    fragment_cache.invalidate(recipe_ids)
+
+
+class FragmentCacheExtension(Extension):
+    """Adds {% cache name, recipe_id, version %} ... {% endcache %} to templates."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        if len(args) != 3:
+            parser.fail("cache tag expects: name, recipe id, version", lineno)
+
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        call = self.call_method("_render_fragment", args)
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, name, recipe_id, version, caller):
+        html = fragment_cache.get_or_render(name, recipe_id, version, lambda: str(caller()))
+        return Markup(html)
@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+__all__ = [
+    "RequestProfiler"
+]
+
+# ON-DEMAND REQUEST PROFILING
+# An admin adds ?_profile=1 (or the header X-Profile: 1) to any URL. For that
+# one request a sampler thread records the request thread's stack every
+# millisecond, and the counts are saved as collapsed stacks ("a;b;c 12" per
+# line), which speedscope.app and flamegraph.pl both open. Requests without
+# the flag only pay for the flag check.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SAMPLE_INTERVAL = 0.001
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(BASE_DIR):
+        filename = os.path.relpath(filename, BASE_DIR)
+    else:
+        # Show site-packages/.../werkzeug/security.py as werkzeug/security.py
+        parts = filename.split(os.sep)
+        filename = os.sep.join(parts[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+class RequestProfiler:
+    def __init__(self, output_dir, allowed):
+        """allowed() is called in the request and decides who may profile."""
+        self.output_dir = output_dir
+        self.allowed = allowed
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.teardown_request(self._finish)
+
+    def _requested(self):
+        # Only the value 1, so ?_profile=0 or X-Profile: 0 turns it off
+        return request.args.get("_profile") == "1" or request.headers.get("X-Profile") == "1"
+
+    def _start(self):
+        if not self._requested() or not self.allowed():
+            return
+        g.profiler = StackSampler(threading.get_ident())
+        g.profiler.start()
+
+    def _finish(self, exc):
+        sampler = g.pop("profiler", None)
+        if sampler is None:
+            return
+        sampler.stop()
+        self._save(sampler)
+
+    def _save(self, sampler):
+        os.makedirs(self.output_dir, exist_ok=True)
+        endpoint = (request.endpoint or "unknown").replace(".", "_")
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.output_dir, f"{stamp}-{endpoint}-{sampler.seconds * 1000:.0f}ms.collapsed")
+        with open(path, "w") as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def list_profiles(self):
+        """Saved profiles, newest first: [(file name, size in bytes), ...]"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = sorted((n for n in os.listdir(self.output_dir) if n.endswith(".collapsed")), reverse=True)
+        return [(name, os.path.getsize(os.path.join(self.output_dir, name))) for name in names]
@@ -0,0 +1,172 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import request
+from werkzeug.exceptions import TooManyRequests
+
+__all__ = [
+    "MemoryStore",
+    "SQLiteStore",
+    "RateLimiter",
+    "rate_limiter"
+]
+
+# RATE LIMITING
+# Token buckets: each key (an IP address or a username, per limit) holds up
+# to `burst` tokens, refilled at `count` per `period` seconds. A request
+# takes one token; with none left it gets a 429 and a Retry-After telling the
+# client when the next token arrives. A full bucket is the same as no bucket,
+# so keys idle for longer than IDLE_SECONDS (more than any limit's period)
+# are dropped.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARED_DB_PATH = os.path.join(BASE_DIR, "db", "ratelimit.db")
+
+LOCK_STRIPES = 64       # MemoryStore: keys hash onto this many locks
+PRUNE_EVERY = 1000      # hits between sweeps for idle buckets
+IDLE_SECONDS = 3600
+
+
+class MemoryStore:
+    """Buckets in a dict in this process; limits are per server worker.
+
+    Keys are spread over striped locks, so concurrent requests only wait on
+    each other when their keys share a stripe.
+    """
+
+    def __init__(self):
+        self._buckets = {}      # key -> (tokens, updated_at)
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._hits = 0
+
+    def hit(self, key, burst, rate, now):
+        """Take a token. Returns seconds to wait, 0 if the request may go ahead."""
+        with self._locks[hash(key) % LOCK_STRIPES]:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+
+        self._hits += 1     # racy on purpose; it only schedules the sweep
+        if self._hits >= PRUNE_EVERY:
+            self._hits = 0
+            self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # Reads without the locks; a bucket refilled in the meantime is
+        # just dropped on the next sweep instead
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if now - updated > IDLE_SECONDS:
+                self._buckets.pop(key, None)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class SQLiteStore:
+    """Buckets in a small SQLite file shared by every server worker.
+
+    Refill and take happen in one UPSERT, so two workers can't both spend
+    the last token. Kept out of database.db so limiter writes never queue
+    behind (or hold up) recipe writes.
+    """
+
+    def __init__(self, path=SHARED_DB_PATH):
+        self.path = path
+        self._table_checked = False
+        self._hits = 0
+        self._local = threading.local()
+
+    def _get_connection(self):
+        # One connection per thread, kept open: this runs on every limited
+        # request. Keyed on pid so a forked worker never reuses its parent's.
+        cached = getattr(self._local, "conn", None)
+        if cached and cached[0] == os.getpid():
+            return cached[1]
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        # Losing a few seconds of counters in a crash doesn't matter, so skip
+        # the fsync on every write
+        conn.execute("PRAGMA synchronous = OFF")
+        if not self._table_checked:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    allowed INTEGER NOT NULL
+                ) WITHOUT ROWID""")
+            self._table_checked = True
+        self._local.conn = (os.getpid(), conn)
+        return conn
+
+    def hit(self, key, burst, rate, now):
+        conn = self._get_connection()
+        # refilled = MIN(burst, tokens + elapsed * rate), written out twice
+        # because SET expressions can't see each other
+        tokens, allowed = conn.execute("""
+            INSERT INTO rate_limits (key, tokens, updated, allowed) VALUES (:key, :burst - 1, :now, 1)
+            ON CONFLICT (key) DO UPDATE SET
+                allowed = MIN(:burst, tokens + (:now - updated) * :rate) >= 1,
+                tokens = MIN(:burst, tokens + (:now - updated) * :rate)
+                         - (MIN(:burst, tokens + (:now - updated) * :rate) >= 1),
+                updated = :now
+            RETURNING tokens, allowed""",
+            {"key": key, "burst": burst, "rate": rate, "now": now}
+        ).fetchone()
+
+        self._hits += 1
+        if self._hits >= PRUNE_EVERY:
+            self._hits = 0
+            conn.execute("DELETE FROM rate_limits WHERE updated < ?", (now - IDLE_SECONDS,))
+        return 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        conn = self._get_connection()
+        conn.execute("DELETE FROM rate_limits")
+
+
+class RateLimiter:
+    def __init__(self, store=None):
+        self.store = store or MemoryStore()
+        self.enabled = True
+
+    def check(self, name, key, count, period, burst=None):
+        """Take a token from bucket (name, key); raise 429 if it's empty."""
+        if not self.enabled or key is None:
+            return
+        wait = self.store.hit(f"{name}:{key}", burst or count, count / period, time.time())
+        if wait:
+            raise TooManyRequests(
+                "Too many requests. Please wait a moment and try again.",
+                retry_after=math.ceil(wait)
+            )
+
+    def limit(self, name, count, period, per_username=None, methods=None):
+        """Decorator for a view: at most `count` requests per `period` seconds
+        per client IP, and per username too if per_username=(count, period)
+        (read from the 'username' form field). methods limits only those
+        HTTP methods, e.g. ('POST',) so showing a form stays free."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped_view(*args, **kwargs):
+                if methods is None or request.method in methods:
+                    self.check(f"{name}:ip", request.remote_addr, count, period)
+                    username = request.form.get('username', '').strip().lower()
+                    if per_username and username:
+                        self.check(f"{name}:user", username, *per_username)
+                return view(*args, **kwargs)
+            return wrapped_view
+        return decorator
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,214 @@
+"""Production server for KitchenHub (POSIX only, it relies on fork).
+
+    KITCHENHUB_ENV=production python serve.py [--bind HOST:PORT] [--workers N] [--threads N] [--no-preload]
+
+The master process opens the listening socket, imports the app once
+(preload, so workers share its memory copy-on-write) and forks workers that
+all accept on that socket. Each worker answers requests from a fixed-size
+thread pool.
+
+Signals to the master:
+    SIGHUP          graceful reload: fork a new set of workers, then let the
+                    old ones finish their in-flight requests and exit
+    SIGTERM/SIGINT  graceful shutdown
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+from config import get_config
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug server that hands each connection to a bounded thread pool."""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd):
+        super().__init__(host, port, app, fd=fd)
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._handle_request, request, client_address)
+
+    def _handle_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def drain(self):
+        # Wait for requests that were already accepted
+        self._pool.shutdown(wait=True)
+        self.server_close()
+
+
+def load_app(config_name):
+    from app import create_app
+    return create_app(config_name)
+
+
+# WORKER
+def run_worker(listener, app, config_name, host, port, threads):
+    # Default signal handling, not the master's
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if app is None:
+        app = load_app(config_name)
+
+    from db.db import init_db_worker, flush_views
+    init_db_worker()
+
+    # Replay the pages that were hot before the restart (warmup.py), in the
+    # background while this worker starts taking requests
+    hot_set = app.extensions.get('hot_set')
+    if hot_set is not None:
+        hot_set.start()
+
+    server = PooledWSGIServer(host, port, app, threads, listener.fileno())
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it can't run here
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    server.serve_forever()
+    server.drain()
+    # Views counted since the last flush; os._exit() skips atexit
+    flush_views()
+
+
+# MASTER
+class Arbiter:
+    def __init__(self, config_name, host, port, workers, threads, preload, graceful_timeout):
+        self.config_name = config_name
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+
+        self.listener = socket.create_server((host, port), backlog=1024, reuse_port=False)
+        self.app = load_app(config_name) if preload else None
+
+        self.workers = {}    # pid -> generation
+        self.generation = 0
+        self._reload = False
+        self._stop = False
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = self.generation
+            return
+
+        status = 0
+        try:
+            run_worker(self.listener, self.app, self.config_name, self.host, self.port, self.threads)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            status = 1
+        finally:
+            os._exit(status)
+
+    def reap_workers(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.workers.pop(pid, None)
+
+    def signal_workers(self, sig, generation=None):
+        for pid, gen in list(self.workers.items()):
+            if generation is None or gen == generation:
+                try:
+                    os.kill(pid, sig)
+                except ProcessLookupError:
+                    self.workers.pop(pid, None)
+
+    def reload(self):
+        old = self.generation
+        self.generation += 1
+        print(f"[master] reloading: starting generation {self.generation}", flush=True)
+        for _ in range(self.num_workers):
+            self.spawn_worker()
+        # New workers are already accepting, so the old ones can drain
+        self.signal_workers(signal.SIGTERM, old)
+
+    def shutdown(self):
+        print("[master] shutting down", flush=True)
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+        self.signal_workers(signal.SIGKILL)
+        self.reap_workers()
+        self.listener.close()
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        print(f"[master] pid {os.getpid()} listening on http://{self.host}:{self.port} "
+              f"({self.num_workers} workers x {self.threads} threads)", flush=True)
+        for _ in range(self.num_workers):
+            self.spawn_worker()
+
+        while not self._stop:
+            if self._reload:
+                self._reload = False
+                self.reload()
+
+            self.reap_workers()
+
+            # Replace current-generation workers that died unexpectedly
+            alive = sum(1 for gen in self.workers.values() if gen == self.generation)
+            for _ in range(self.num_workers - alive):
+                self.spawn_worker()
+
+            time.sleep(0.5)
+
+        self.shutdown()
+
+
+def main(argv=None):
+    config_name = os.environ.get("KITCHENHUB_ENV", "production")
+    config = get_config(config_name)
+
+    parser = argparse.ArgumentParser(description="Run KitchenHub with preforked workers.")
+    parser.add_argument("--bind", default=f"{config.HOST}:{config.PORT}", help="HOST:PORT to listen on")
+    parser.add_argument("--workers", type=int, default=config.WORKERS)
+    parser.add_argument("--threads", type=int, default=config.THREADS)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=config.PRELOAD_APP,
+                        help="import the app in each worker instead of the master")
+    args = parser.parse_args(argv)
+
+    # Migrate once here, before any worker exists, instead of in every worker
+    from db.db import migrate
+    migrate()
+
+    host, _, port = args.bind.rpartition(":")
+    Arbiter(
+        config_name, host or "0.0.0.0", int(port),
+        max(1, args.workers), max(1, args.threads), args.preload, config.GRACEFUL_TIMEOUT
+    ).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
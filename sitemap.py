@@ -0,0 +1,190 @@
+import fcntl
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from flask import request, url_for
+
+__all__ = [
+    "SitemapCache"
+]
+
+# SITEMAP AND FEED
+# /sitemap.xml and /feed.atom are written to files under output_dir and
+# served from there. Recipes are split by id into chunks of CHUNK_IDS, one
+# sitemap file each. Before a file is served the change log is read from the
+# last seq seen, and the files of the chunks holding changed recipes (and
+# the feed) are deleted; a missing file is written again on demand,
+# streaming rows from the database, so an edit rewrites one chunk and memory
+# use doesn't grow with the catalog. With a single chunk /sitemap.xml is
+# that chunk, otherwise it is a sitemap index of /sitemap-<n>.xml files.
+
+SITEMAP_MAX_URLS = 50000
+STATIC_ENDPOINTS = ("home", "recipes", "about", "contact")
+# Chunk 0 also lists the static pages, so no file goes over the limit
+CHUNK_IDS = SITEMAP_MAX_URLS - len(STATIC_ENDPOINTS)
+
+FEED_SIZE = 50
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+def _w3c_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SitemapCache:
+    def __init__(self, output_dir, iter_rows, load_max_id, load_recent, load_changes, chunk_ids=CHUNK_IDS):
+        """iter_rows(first_id, end_id) yields (id, updated_at) rows in id order;
+        load_max_id() returns the highest recipe id or None; load_recent(limit)
+        returns recipe rows newest first; load_changes(after_seq) returns
+        (changed recipe ids or None, seq) as for RecipeCatalog."""
+        self.output_dir = output_dir
+        self.iter_rows = iter_rows
+        self.load_max_id = load_max_id
+        self.load_recent = load_recent
+        self.load_changes = load_changes
+        self.chunk_ids = chunk_ids
+
+    # Each returns an open file that is up to date with the database. It is
+    # opened before the lock is released, so a later change deleting the
+    # file doesn't pull it from under the response.
+    def sitemap(self):
+        with self._synced():
+            count = self._chunk_count()
+            if count == 1:
+                return self._file("sitemap-0.xml", self._chunk_lines, 0)
+            return self._file(f"index-{count}.xml", self._index_lines, count)
+
+    def chunk(self, n):
+        """None if there is no chunk n."""
+        with self._synced():
+            if not 0 <= n < self._chunk_count():
+                return None
+            return self._file(f"sitemap-{n}.xml", self._chunk_lines, n)
+
+    def feed(self):
+        with self._synced():
+            return self._file("feed.atom", self._feed_lines)
+
+    @contextmanager
+    def _synced(self):
+        # One process or thread at a time, so a file written from rows read
+        # before a change can't land after that change deleted it
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._sync()
+            yield
+
+    def _sync(self):
+        state_path = os.path.join(self.output_dir, "state.json")
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+
+        # URLs are absolute, so files written for another host are useless
+        base = request.url_root
+        changed = None
+        if state is not None and state["base"] == base:
+            changed, seq = self.load_changes(state["seq"])
+        if changed is None:
+            # First run, new host, or the log can't tell what changed
+            _, seq = self.load_changes(None)
+            for name in os.listdir(self.output_dir):
+                if name.endswith((".xml", ".atom")):
+                    os.unlink(os.path.join(self.output_dir, name))
+        elif changed:
+            stale = {f"sitemap-{recipe_id // self.chunk_ids}.xml" for recipe_id in changed}
+            for name in stale | {"feed.atom"}:
+                if os.path.exists(os.path.join(self.output_dir, name)):
+                    os.unlink(os.path.join(self.output_dir, name))
+
+        if state is None or (state["base"], state["seq"]) != (base, seq):
+            self._write(state_path, [json.dumps({"base": base, "seq": seq})])
+
+    def _chunk_count(self):
+        max_id = self.load_max_id()
+        return 1 if max_id is None else max_id // self.chunk_ids + 1
+
+    def _file(self, name, lines, *args):
+        path = os.path.join(self.output_dir, name)
+        if not os.path.exists(path):
+            self._write(path, lines(*args))
+        return open(path, "rb")
+
+    def _write(self, path, lines):
+        # Readers never see a half-written file
+        fd, partial = tempfile.mkstemp(dir=self.output_dir, suffix=".partial")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(line)
+            os.replace(partial, path)
+        except BaseException:
+            os.unlink(partial)
+            raise
+
+    def _url(self, loc, lastmod=None):
+        line = f"<url><loc>{escape(loc)}</loc>"
+        if lastmod:
+            line += f"<lastmod>{_w3c_time(lastmod)}</lastmod>"
+        return line + "</url>\n"
+
+    def _chunk_lines(self, n):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+        if n == 0:
+            for endpoint in STATIC_ENDPOINTS:
+                yield self._url(url_for(endpoint, _external=True))
+        for recipe_id, updated_at in self.iter_rows(n * self.chunk_ids, (n + 1) * self.chunk_ids):
+            yield self._url(url_for("recipe", id=recipe_id, _external=True), updated_at)
+        yield "</urlset>\n"
+
+    def _index_lines(self, count):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+        for n in range(count):
+            yield f"<sitemap><loc>{escape(url_for('sitemap_chunk', n=n, _external=True))}</loc></sitemap>\n"
+        yield "</sitemapindex>\n"
+
+    def _feed_lines(self):
+        rows = self.load_recent(FEED_SIZE)
+        updated = max((row["updated_at"] or 0 for row in rows), default=0) or time.time()
+        recipes_url = url_for("recipes", _external=True)
+
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield f'<feed xmlns="{ATOM_NS}">\n'
+        yield "<title>KitchenHub recipes</title>\n"
+        yield f"<id>{escape(recipes_url)}</id>\n"
+        yield f"<link rel=\"self\" href={quoteattr(url_for('feed', _external=True))}/>\n"
+        yield f"<link href={quoteattr(recipes_url)}/>\n"
+        yield f"<updated>{_w3c_time(updated)}</updated>\n"
+        yield "<author><name>KitchenHub</name></author>\n"
+        for row in rows:
+            url = url_for("recipe", id=row["id"], _external=True)
+            created = row["created_at"] or updated
+            summary = ", ".join(str(part) for part in (
+                row["cuisine"],
+                f"{(row['prep_time'] or 0) + (row['cook_time'] or 0):g} min",
+                f"serves {row['portion']}" if row["portion"] else None,
+                f"rated {row['rating']}/5" if row["rating"] else None,
+            ) if part)
+            yield (
+                "<entry>"
+                f"<title>{escape(row['name'])}</title>"
+                f"<id>{escape(url)}</id>"
+                f"<link href={quoteattr(url)}/>"
+                f"<published>{_w3c_time(created)}</published>"
+                f"<updated>{_w3c_time(row['updated_at'] or created)}</updated>"
+                f"<summary>{escape(summary)}</summary>"
+                "</entry>\n"
+            )
+        yield "</feed>\n"
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read by config.py when it is imported: no background threads or per-IP
+# limits in tests
+os.environ.setdefault("KITCHENHUB_JOB_THREADS", "0")
+os.environ.setdefault("KITCHENHUB_WARMUP", "0")
+os.environ.setdefault("KITCHENHUB_RATE_LIMIT", "0")
+
+import db.db as db_module  # noqa: E402
+import db.jobs as jobs_module  # noqa: E402
+from app import app as flask_app, create_app, recipe_catalog  # noqa: E402
+from fragment_cache import fragment_cache  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The app on a copy of db/database.db, so tests never write to the real one."""
+    database = tmp_path / "database.db"
+    shutil.copyfile(db_module.DB_PATH, database)
+    monkeypatch.setattr(db_module, "DB_PATH", str(database))
+    monkeypatch.setattr(db_module, "_schema_checked", False)
+    # The job queue opens the same file by its own path
+    monkeypatch.setattr(jobs_module, "DB_PATH", str(database))
+    monkeypatch.setattr(jobs_module, "_table_checked", False)
+
+    create_app("production")
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    fragment_cache.clear()
+    recipe_catalog.reload()
+    yield flask_app
+    # Write the views counted here while DB_PATH still points at the copy
+    db_module._view_counter.flush()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session["username"] = "admin"
+    return client
@@ -0,0 +1,40 @@
+import pytest
+
+import db.db as db_module
+from app import recipe_catalog
+
+URL = "/api/v1/admin/recipes/bulk"
+
+
+def recipe_ids():
+    conn = db_module.get_db_connection()
+    ids = [row[0] for row in conn.execute("SELECT id FROM recipes ORDER BY id")]
+    conn.close()
+    return ids
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {"action": "delete", "ids": [True]},
+    {"action": "delete", "ids": [1, False]},
+    {"action": "delete", "ids": ["1"]},
+    {"action": "rating", "ids": [1], "rating": True},
+])
+def test_bulk_rejects_bad_input(admin_client, body):
+    before = recipe_ids()
+    response = admin_client.post(URL, json=body)
+    assert response.status_code == 400
+    assert recipe_ids() == before
+
+
+def test_bulk_notifies_listeners_once(admin_client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(db_module, "_recipe_change_listeners",
+                        [*db_module._recipe_change_listeners, calls.append])
+    ids = recipe_ids()[:2]
+
+    response = admin_client.post(URL, json={"action": "delete", "ids": ids})
+    assert response.get_json()["affected"] == 2
+    assert calls == [ids]
+    cards = recipe_catalog.top_k("rating", k=len(recipe_catalog), include_missing=True)
+    assert not {card["id"] for card in cards} & set(ids)
@@ -0,0 +1,57 @@
+import db.db as db_module
+from db.leaderboard import rebuild_leaderboards
+
+
+def quickest_ids():
+    return [row["id"] for row in db_module.get_leaderboard("quickest")]
+
+
+def test_blank_prep_time_is_stored_as_null(client):
+    response = client.post("/create/", data={
+        "name": "No prep", "method": "Boil.", "cook_time": "5", "prep_time": "",
+        "portion": "2", "cuisine": "Test", "rating": "",
+    })
+    assert response.status_code == 302
+
+    conn = db_module.get_db_connection()
+    row = conn.execute("SELECT id, prep_time, cook_time FROM recipes WHERE name = 'No prep'").fetchone()
+    conn.close()
+    assert row["prep_time"] is None and row["cook_time"] == 5
+    assert row["id"] not in quickest_ids()
+    assert client.get("/").status_code == 200
+
+
+def test_text_times_stay_off_the_board(client):
+    conn = db_module.get_db_connection()
+    recipe_id = conn.execute(
+        "INSERT INTO recipes (name, prep_time, cook_time, rating) VALUES ('Text times', '', 1, '')"
+    ).lastrowid
+    rebuild_leaderboards(conn)
+    conn.commit()
+    conn.close()
+
+    assert recipe_id not in quickest_ids()
+    assert recipe_id not in [row["id"] for row in db_module.get_leaderboard("top_rated")]
+    assert client.get("/").status_code == 200
+
+
+def test_upgrade_clears_text_times(app):
+    conn = db_module.get_db_connection()
+    recipe_id = conn.execute(
+        "INSERT INTO recipes (name, prep_time, cook_time) VALUES ('Old row', '', 1)"
+    ).lastrowid
+    conn.execute("PRAGMA user_version = 7")
+    conn.commit()
+    conn.close()
+
+    db_module.migrate()
+    conn = db_module.get_db_connection()
+    assert conn.execute("SELECT prep_time FROM recipes WHERE id = ?", (recipe_id,)).fetchone()[0] is None
+    conn.close()
+
+
+def test_home_shows_stored_total_time(client):
+    board = db_module.get_leaderboard("quickest")
+    assert board
+    html = client.get("/").get_data(as_text=True)
+    assert f"{int(board[0]['score'])} min" in html
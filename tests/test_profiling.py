@@ -0,0 +1,26 @@
+import pytest
+
+from app import profiler
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "output_dir", str(tmp_path / "profiles"))
+    return profiler.list_profiles
+
+
+@pytest.mark.parametrize("query, headers", [
+    ("?_profile=0", {}),
+    ("?_profile=", {}),
+    ("", {"X-Profile": "0"}),
+    ("", {}),
+])
+def test_profiling_needs_the_value_1(admin_client, profiles, query, headers):
+    admin_client.get("/about/" + query, headers=headers)
+    assert profiles() == []
+
+
+@pytest.mark.parametrize("query, headers", [("?_profile=1", {}), ("", {"X-Profile": "1"})])
+def test_profiling_on_request(admin_client, profiles, query, headers):
+    admin_client.get("/about/" + query, headers=headers)
+    assert len(profiles()) == 1
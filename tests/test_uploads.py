@@ -0,0 +1,33 @@
+import io
+
+import pytest
+
+from uploads import image_info
+
+TRUNCATED = [
+    b"\xff\xd8\xff\xc0\x00\x11\x08",                          # JPEG frame header cut short
+    b"\xff\xd8\xff\xe0\x00",                                  # JPEG segment length cut short
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR\x00\x00",         # PNG without its size
+    b"GIF89a\x01",
+    b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00",
+    b"RIFF\x00\x00\x00\x00WEBPVP8X\x00\x00",
+]
+
+
+@pytest.mark.parametrize("data", TRUNCATED)
+def test_truncated_image_is_not_an_image(data):
+    assert image_info(io.BytesIO(data)) is None
+
+
+def test_jpeg_size():
+    data = b"\xff\xd8\xff\xe0\x00\x04\x00\x00\xff\xc0\x00\x11\x08\x00\x20\x00\x40"
+    assert image_info(io.BytesIO(data)) == ("image/jpeg", 64, 32)
+
+
+def test_truncated_poster_is_rejected(client):
+    response = client.post("/create/", data={
+        "name": "Bad poster", "portion": "1",
+        "poster": (io.BytesIO(b"\xff\xd8\xff\xc0\x00\x11\x08"), "poster.jpg"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert "Please upload a PNG, JPEG, GIF or WebP image." in response.get_data(as_text=True)
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import struct
+import tempfile
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+__all__ = [
+    "UploadRequest",
+    "store_image",
+    "image_info",
+    "UPLOAD_URL"
+]
+
+# POSTER UPLOADS
+# Uploaded files are written straight from the multipart parser into a temp
+# file next to the store, hashed as the chunks arrive. Once the request is
+# parsed the file is renamed to its SHA-256 (content addressing), so the same
+# image uploaded twice is stored once, and the name never has to change.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR = os.path.join(BASE_DIR, "static", "uploads", "store")
+UPLOAD_URL = "/static/uploads/store"
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+class HashingFile:
+    """Temp file in UPLOAD_DIR that hashes and counts what is written to it."""
+
+    def __init__(self, max_bytes):
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, prefix=".upload-", delete=False)
+        self.path = self._file.name
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.max_bytes = max_bytes
+        self.stored = False
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(f"Uploads are limited to {self.max_bytes // (1024 * 1024)} MB.")
+        self.sha256.update(chunk)
+        return self._file.write(chunk)
+
+    def close(self):
+        # Called by werkzeug when the request ends; drops files nobody stored
+        if not self._file.closed:
+            self._file.close()
+        if not self.stored and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush for werkzeug's FileStorage
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request whose multipart file parts stream into HashingFile."""
+
+    max_upload_bytes = MAX_UPLOAD_BYTES
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingFile(self.max_upload_bytes)
+
+
+def image_info(f):
+    """(mime type, width, height) read from an image's header bytes, or None.
+
+    Only the first few bytes are read (JPEG: the segment headers up to the
+    frame header), so this is cheap however big the image is. A file cut
+    off before the size is None as well.
+    """
+    f.seek(0)
+    head = f.read(32)
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR" and len(head) >= 24:
+        width, height = struct.unpack(">II", head[16:24])
+        return "image/png", width, height
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        width, height = struct.unpack("<HH", head[6:10])
+        return "image/gif", width, height
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        chunk = head[12:16]
+        if chunk == b"VP8 " and len(head) >= 30:
+            width, height = struct.unpack("<HH", head[26:30])
+            return "image/webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and len(head) >= 25:
+            bits = int.from_bytes(head[21:25], "little")
+            return "image/webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X" and len(head) >= 30:
+            return "image/webp", int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+        return None
+    if head[:2] == b"\xff\xd8":
+        return _jpeg_info(f)
+    return None
+
+
+def _jpeg_info(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        # SOF0-SOF15 carry the size; C4, C8 and CC are other segments
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return "image/jpeg", width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+def store_image(file_storage):
+    """Keep an uploaded image (a FileStorage from UploadRequest).
+
+    Returns dict(sha256, url, mime, width, height, size). Raises ValueError
+    if the file isn't a PNG, JPEG, GIF or WebP image.
+    """
+    upload = file_storage.stream
+    if not isinstance(upload, HashingFile):
+        raise ValueError("Upload was not streamed through UploadRequest")
+
+    info = image_info(upload)
+    if info is None:
+        raise ValueError("Please upload a PNG, JPEG, GIF or WebP image.")
+    mime, width, height = info
+
+    digest = upload.sha256.hexdigest()
+    name = digest + EXTENSIONS[mime]
+    path = os.path.join(UPLOAD_DIR, name)
+    if os.path.exists(path):
+        # Already stored; close() deletes this copy
+        upload.close()
+    else:
+        upload.flush()
+        os.fsync(upload.fileno())
+        # Atomic: readers see the whole file or none. Two identical uploads
+        # racing here both write the same bytes under the same name.
+        os.replace(upload.path, path)
+        upload.stored = True
+
+    return {
+        "sha256": digest,
+        "url": f"{UPLOAD_URL}/{name}",
+        "mime": mime,
+        "width": width,
+        "height": height,
+        "size": upload.size,
+    }
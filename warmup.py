@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import request
+
+__all__ = [
+    "HotSet",
+    "is_warmup"
+]
+
+# CACHE WARM-UP
+# Each worker counts the pages it serves (recipe pages, listings in each sort
+# order, searches) and every SAVE_INTERVAL seconds writes its HOT_SIZE most
+# requested paths to a small JSON file, halving the counts so the list
+# follows current traffic. A worker that has just started, after a deploy or
+# a restart, replays those paths through the app from a background thread,
+# a few at a time, so the catalog, recipe card fragments, templates and
+# SQLite's page cache are warm by the time visitors ask for the same pages.
+# serve.py calls start() in each worker as soon as it is forked.
+
+HOT_SIZE = 200
+SAVE_INTERVAL = 60
+MAX_TRACKED = 10000         # distinct paths counted before the rarest are dropped
+WARM_CONCURRENCY = 2
+
+WARMUP_ENVIRON_KEY = "kitchenhub.warmup"
+
+
+def is_warmup():
+    """True for requests replayed by the warm-up, which shouldn't count as visits."""
+    return request.environ.get(WARMUP_ENVIRON_KEY, False)
+
+
+class HotSet:
+    def __init__(self, path, endpoints, size=HOT_SIZE, save_interval=SAVE_INTERVAL, concurrency=WARM_CONCURRENCY):
+        """endpoints: the endpoints whose GET requests are counted and replayed."""
+        self.path = path
+        self.endpoints = set(endpoints)
+        self.size = size
+        self.save_interval = save_interval
+        self.concurrency = concurrency
+        self.enabled = True
+        self.app = None
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._started_pid = None
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["hot_set"] = self
+        app.after_request(self._record)
+
+    def _record(self, response):
+        if (self.enabled and request.method == "GET" and response.status_code == 200
+                and request.endpoint in self.endpoints and not is_warmup()):
+            path = request.full_path.rstrip("?")
+            with self._lock:
+                self._counts[path] += 1
+                if len(self._counts) > MAX_TRACKED:
+                    self._counts = Counter(dict(self._counts.most_common(MAX_TRACKED // 2)))
+        return response
+
+    def start(self):
+        """Replay the saved paths and start saving new ones, once per process.
+        Keyed on pid like the job worker: each forked server worker warms its
+        own caches and counts its own traffic."""
+        if self._started_pid == os.getpid() or not self.enabled:
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._counts = Counter()
+            threading.Thread(target=self._run, args=(self.load(),), name="warmup", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _run(self, paths):
+        if paths:
+            seconds = self.warm(paths)
+            print(f"[warmup] pid {os.getpid()} replayed {len(paths)} pages in {seconds:.2f}s", flush=True)
+        while True:
+            time.sleep(self.save_interval)
+            self.save()
+
+    def load(self):
+        """Saved hot paths, most requested first ([] if none were saved)."""
+        try:
+            with open(self.path) as f:
+                return json.load(f)["paths"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def save(self):
+        with self._lock:
+            top = self._counts.most_common(self.size)
+            self._counts = Counter({path: count // 2 for path, count in self._counts.items() if count > 1})
+        if not top:
+            # An idle worker keeps the last list instead of wiping it
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".partial")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"saved_at": time.time(), "paths": [path for path, count in top]}, f)
+        os.replace(partial, self.path)
+
+    def warm(self, paths):
+        """Request each path in the background; returns the seconds it took."""
+        def fetch(path):
+            # No client address, so the rate limiter leaves it alone
+            self.app.test_client(use_cookies=False).get(
+                path, environ_overrides={WARMUP_ENVIRON_KEY: True, "REMOTE_ADDR": None}
+            )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="warmup") as pool:
+            for future in [pool.submit(fetch, path) for path in paths]:
+                try:
+                    future.result()
+                except Exception:
+                    pass    # a page that fails now will fail for its visitor too
+        return time.perf_counter() - start